@@ -1,59 +1,114 @@
 from django.contrib import admin, messages
-from .models import Fonte, Noticia
-import feedparser
-from django.utils.timezone import make_aware
-from datetime import datetime
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.urls import reverse
+from .models import Fonte, ImportRun, ImportRunFonte, Noticia, NoticiaArquivada, PerfilExtracao
+from .arquivamento import descompactar
+from . import circuito
+from .busca import buscar
+from .canonicalizacao import hash_url
+from .execucoes import tempo_total
+from .tasks import importar_noticias_task
 from django.utils.html import format_html
 from django.utils.safestring import mark_safe
 
 def importar_noticias(modeladmin, request, queryset):
-    for fonte in queryset:
-        feed = feedparser.parse(fonte.feed_url)
-        count = 0
-        for entry in feed.entries:
-            link = entry.link
-            titulo = entry.title
-            resumo = getattr(entry, 'summary', '')[:1000]
-            
-            # Se o feed tiver published_parsed, convertemos para datetime
-            if hasattr(entry, 'published_parsed'):
-                publicado_em = make_aware(datetime(*entry.published_parsed[:6]))
-            else:
-                publicado_em = make_aware(datetime.now())
-            
-            # Cria a notícia apenas se não existir duplicada
-            noticia, created = Noticia.objects.get_or_create(
-                fonte=fonte,
-                link=link,
-                defaults={
-                    'titulo': titulo,
-                    'resumo': resumo,
-                    'publicado_em': publicado_em,
-                }
-            )
-            if created:
-                count += 1
-        messages.info(request, f'{count} notícias importadas da fonte "{fonte.nome}"')
+    # A importação roda no Celery (mesmo pipeline do agendamento); o admin só acompanha.
+    # Fontes selecionadas à mão entram mesmo se estiverem inativas.
+    fonte_ids = list(queryset.values_list("id", flat=True))
+    execucao = ImportRun.objects.create(origem="admin", usuario=request.user, total_fontes=len(fonte_ids))
+
+    def despachar():
+        resultado = importar_noticias_task.delay(fonte_ids=fonte_ids, import_run_id=execucao.pk, incluir_inativas=True)
+        ImportRun.objects.filter(pk=execucao.pk).update(task_id=resultado.id)
+
+    transaction.on_commit(despachar)
+    url = reverse("admin:noticias_importrun_change", args=[execucao.pk])
+    messages.success(
+        request,
+        format_html('Importação de {} fonte(s) enviada para a fila. <a href="{}">Acompanhar</a>', len(fonte_ids), url),
+    )
 
 importar_noticias.short_description = "Importar notícias do feed selecionado"
 
+
+class CircuitoFilter(admin.SimpleListFilter):
+    title = "circuito"
+    parameter_name = "circuito"
+
+    def lookups(self, request, model_admin):
+        return [(circuito.ABERTO, "Aberto"), (circuito.SONDA, "Aguardando sonda"), (circuito.FECHADO, "Fechado")]
+
+    def queryset(self, request, queryset):
+        agora = timezone.now()
+        falhando = queryset.filter(falhas_consecutivas__gte=settings.NOTICIAS_CIRCUITO_FALHAS, circuito_aberto_ate__isnull=False)
+        if self.value() == circuito.ABERTO:
+            return falhando.filter(circuito_aberto_ate__gt=agora)
+        if self.value() == circuito.SONDA:
+            return falhando.filter(circuito_aberto_ate__lte=agora)
+        if self.value() == circuito.FECHADO:
+            return queryset.exclude(pk__in=falhando.values("pk"))
+        return queryset
+
+
+def situacao_circuito(obj):
+    situacao = circuito.estado(obj.falhas_consecutivas, obj.circuito_aberto_ate)
+    if situacao == circuito.ABERTO:
+        horario = timezone.localtime(obj.circuito_aberto_ate).strftime("%d/%m %H:%M")
+        return format_html('<span style="color: #ba2121;">Aberto até {}</span>', horario)
+    if situacao == circuito.SONDA:
+        return mark_safe('<span style="color: #c77c00;">Aguardando sonda</span>')
+    return "Fechado"
+
+
+def fechar_circuito(modeladmin, request, queryset):
+    campos = {"falhas_consecutivas": 0, "circuito_aberto_ate": None}
+    if queryset.model is Fonte:
+        campos.update(ultimo_erro="", proxima_coleta_em=None)  # volta para a próxima rodada do agendamento
+    fechados = queryset.update(**campos)
+    messages.success(request, f"{fechados} circuito(s) fechado(s)")
+
+fechar_circuito.short_description = "Fechar circuito (tentar de novo na próxima coleta)"
+
 @admin.register(Fonte)
 class FonteAdmin(admin.ModelAdmin):
-    list_display = ("nome", "feed_url", "categoria_padrao", "ativo", "criado_em")
-    list_filter = ("ativo", "categoria_padrao", "criado_em")
+    list_display = ("nome", "feed_url", "categoria_padrao", "ativo", "intervalo_coleta_formatado", "proxima_coleta_em", "falhas_consecutivas", "circuito", "criado_em")
+    list_filter = ("ativo", CircuitoFilter, "categoria_padrao", "criado_em")
     search_fields = ("nome", "feed_url")
     ordering = ("-criado_em",)
-    actions = [importar_noticias]  # adiciona a ação no admin
+    readonly_fields = ("intervalo_publicacao", "ultima_coleta_em", "falhas_consecutivas", "circuito_aberto_ate", "ultimo_erro", "etag", "ultima_modificacao", "hash_conteudo")
+    actions = [importar_noticias, fechar_circuito]  # adiciona a ação no admin
+
+    def circuito(self, obj):
+        return situacao_circuito(obj)
+    circuito.short_description = "Circuito"
+
+    def intervalo_coleta_formatado(self, obj):
+        minutos = obj.intervalo_coleta // 60
+        if minutos >= 60:
+            return f"{minutos // 60}h{minutos % 60:02d}"
+        return f"{minutos} min"
+    intervalo_coleta_formatado.short_description = "Intervalo de coleta"
 
 
 @admin.register(Noticia)
 class NoticiaAdmin(admin.ModelAdmin):
     list_display = ("titulo", "fonte", "categoria_fonte", "publicado_em", "criado_em", "resumo_formatado", "link_original")
     list_filter = ("fonte", "publicado_em", "criado_em")
-    search_fields = ("titulo", "resumo", "link")
+    search_fields = ("titulo",)
     date_hierarchy = "publicado_em"
     ordering = ("-publicado_em",)
 
+    def get_search_results(self, request, queryset, search_term):
+        # Links são buscados por igualdade; o resto vai para a busca textual (índice GIN)
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        if search_term.startswith(("http://", "https://")):
+            return queryset.filter(link_hash=hash_url(search_term)), False
+        return buscar(queryset, search_term), False
+
     def link_original(self, obj):
         return format_html('<a href="{}" target="_blank">Abrir</a>', obj.link)
     link_original.short_description = "Link Original"
@@ -69,3 +124,148 @@ class NoticiaAdmin(admin.ModelAdmin):
         return obj.fonte.categoria_padrao
     categoria_fonte.short_description = "Categoria"
 
+
+
+@admin.register(PerfilExtracao)
+class PerfilExtracaoAdmin(admin.ModelAdmin):
+    list_display = ("dominio", "seletor", "tentativas", "rendimento_formatado", "tempo_medio_formatado", "caracteres_extraidos", "circuito", "atualizado_em")
+    list_filter = (CircuitoFilter,)
+    search_fields = ("dominio",)
+    ordering = ("-tempo_download",)
+    readonly_fields = ("tentativas", "sucessos", "caracteres_extraidos", "tempo_download", "tempo_extracao", "falhas_consecutivas", "circuito_aberto_ate", "atualizado_em")
+    actions = [fechar_circuito]
+
+    def circuito(self, obj):
+        return situacao_circuito(obj)
+    circuito.short_description = "Circuito"
+
+    def rendimento_formatado(self, obj):
+        if obj.rendimento is None:
+            return "-"
+        return f"{obj.rendimento:.0%}"
+    rendimento_formatado.short_description = "Rendimento"
+
+    def tempo_medio_formatado(self, obj):
+        if obj.tempo_medio is None:
+            return "-"
+        return f"{obj.tempo_medio:.2f}s"
+    tempo_medio_formatado.short_description = "Tempo médio"
+
+
+@admin.register(NoticiaArquivada)
+class NoticiaArquivadaAdmin(admin.ModelAdmin):
+    list_display = ("titulo", "fonte", "categoria", "publicado_em", "arquivado_em", "tamanho_compactado")
+    list_filter = ("fonte", "arquivado_em")
+    search_fields = ("titulo", "link")
+    date_hierarchy = "publicado_em"
+    ordering = ("-publicado_em",)
+    exclude = ("conteudo",)
+    readonly_fields = ("id", "fonte", "titulo", "categoria", "link", "publicado_em", "criado_em", "arquivado_em", "conteudo_original")
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def get_search_results(self, request, queryset, search_term):
+        # Links pelo hash canônico (índice fonte/link_hash); o resto pela busca padrão
+        if search_term.strip().startswith(("http://", "https://")):
+            return queryset.filter(link_hash=hash_url(search_term.strip())), False
+        return super().get_search_results(request, queryset, search_term)
+
+    def tamanho_compactado(self, obj):
+        return f"{len(obj.conteudo) / 1024:.1f} KB"
+    tamanho_compactado.short_description = "Tamanho"
+
+    def conteudo_original(self, obj):
+        dados = descompactar(obj.conteudo)
+        return format_html("<p>{}</p><hr><div>{}</div>", dados.get("resumo") or "", dados.get("conteudo_completo") or "")
+    conteudo_original.short_description = "Conteúdo"
+
+
+class ImportRunFonteInline(admin.TabularInline):
+    model = ImportRunFonte
+    fields = ("nome_fonte", "bytes", "latencia", "nao_modificado", "tempo_parse", "tempo_persistencia", "entradas_vistas", "criadas", "ignoradas", "puladas", "raspagens", "tempo_raspagem", "erro")
+    readonly_fields = fields
+    extra = 0
+    can_delete = False
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(ImportRun)
+class ImportRunAdmin(admin.ModelAdmin):
+    list_display = ("__str__", "origem", "status", "progresso_formatado", "criadas", "ignoradas", "erros", "usuario", "criado_em", "duracao_formatada")
+    list_filter = ("status", "origem")
+    ordering = ("-criado_em",)
+    readonly_fields = ("status", "origem", "usuario", "task_id", "total_fontes", "fontes_processadas", "criadas", "ignoradas", "erros", "erro", "criado_em", "iniciado_em", "finalizado_em")
+    change_list_template = "admin/noticias/importrun/change_list.html"
+    change_form_template = "admin/noticias/importrun/change_form.html"
+    inlines = [ImportRunFonteInline]
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def em_andamento(self):
+        return ImportRun.objects.filter(status__in=ImportRun.EM_ANDAMENTO).exists()
+
+    def changelist_view(self, request, extra_context=None):
+        # Enquanto houver importação rodando, a página se recarrega sozinha
+        extra_context = {**(extra_context or {}), "atualizar_automaticamente": self.em_andamento()}
+        return super().changelist_view(request, extra_context)
+
+    def change_view(self, request, object_id, form_url="", extra_context=None):
+        andamento = ImportRun.objects.filter(pk=object_id, status__in=ImportRun.EM_ANDAMENTO).exists()
+        extra_context = {**(extra_context or {}), "atualizar_automaticamente": andamento}
+        return super().change_view(request, object_id, form_url, extra_context)
+
+    def progresso_formatado(self, obj):
+        if obj.progresso is None:
+            return "-"
+        return format_html(
+            '<progress value="{}" max="{}"></progress> {}/{}',
+            obj.fontes_processadas, obj.total_fontes, obj.fontes_processadas, obj.total_fontes,
+        )
+    progresso_formatado.short_description = "Progresso"
+
+    def duracao_formatada(self, obj):
+        if obj.duracao is None:
+            return "-"
+        return f"{obj.duracao:.1f}s"
+    duracao_formatada.short_description = "Duração"
+
+
+@admin.register(ImportRunFonte)
+class ImportRunFonteAdmin(admin.ModelAdmin):
+    list_display = ("nome_fonte", "execucao", "tempo_total_formatado", "latencia", "kbytes", "tempo_parse", "tempo_persistencia", "entradas_vistas", "criadas", "puladas", "raspagens", "tempo_raspagem", "erro_resumido", "criado_em")
+    list_filter = ("nao_modificado", "criado_em", "fonte")
+    search_fields = ("nome_fonte", "erro")
+    date_hierarchy = "criado_em"
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(tempo_total_db=tempo_total())
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def tempo_total_formatado(self, obj):
+        return f"{obj.tempo_total_db:.2f}s"
+    tempo_total_formatado.short_description = "Tempo total"
+    tempo_total_formatado.admin_order_field = "tempo_total_db"
+
+    def kbytes(self, obj):
+        return f"{obj.bytes / 1024:.1f} KB"
+    kbytes.short_description = "Feed"
+    kbytes.admin_order_field = "bytes"
+
+    def erro_resumido(self, obj):
+        return obj.erro[:80] or "-"
+    erro_resumido.short_description = "Erro"
@@ -0,0 +1,110 @@
+from datetime import datetime, timedelta
+from statistics import median
+
+from django.conf import settings
+from django.db.models import F, Q
+from django.utils import timezone
+
+from . import circuito
+from .models import Fonte
+
+# Peso da observação mais recente na média móvel do intervalo de publicação
+PESO_OBSERVACAO = 0.3
+
+# Fator de aumento do intervalo quando a fonte não trouxe nada novo
+FATOR_RECUO_SEM_NOVIDADES = 1.5
+
+
+def _limitar(segundos):
+    return int(min(max(segundos, settings.NOTICIAS_COLETA_INTERVALO_MIN), settings.NOTICIAS_COLETA_INTERVALO_MAX))
+
+
+def intervalo_publicacao_observado(feed):
+    """
+    Mediana (em segundos) entre as datas de publicação das entradas do feed.
+
+    O próprio feed já traz o histórico recente da fonte, então não é preciso
+    consultar o banco. Retorna None se houver menos de duas datas válidas.
+    """
+    datas = sorted(
+        datetime(*entry.published_parsed[:6])
+        for entry in getattr(feed, 'entries', [])
+        if getattr(entry, 'published_parsed', None)
+    )
+    intervalos = [
+        (posterior - anterior).total_seconds()
+        for anterior, posterior in zip(datas, datas[1:])
+        if posterior > anterior
+    ]
+    return median(intervalos) if intervalos else None
+
+
+def registrar_coleta(fonte, sucesso, criadas=0, feed=None, erro=''):
+    """
+    Atualiza o agendamento adaptativo da fonte depois de uma coleta.
+
+    - Falha: recuo exponencial a partir do intervalo padrão (1x, 2x, 4x, ...).
+    - Sucesso com novidades: coleta a cada metade do intervalo de publicação
+      observado (média móvel), para pegar as notícias logo depois de saírem.
+    - Sucesso sem novidades: o intervalo cresce aos poucos, até no máximo o
+      dobro do intervalo de publicação observado.
+
+    Todos os intervalos ficam entre NOTICIAS_COLETA_INTERVALO_MIN e _MAX.
+    Depois de NOTICIAS_CIRCUITO_FALHAS falhas seguidas o circuito da fonte
+    abre e a próxima coleta espera também o fim dele (ver circuito.py).
+    """
+    agora = timezone.now()
+    padrao = settings.NOTICIAS_COLETA_INTERVALO_PADRAO
+    fonte.falhas_consecutivas, fonte.circuito_aberto_ate = circuito.registrar(fonte.falhas_consecutivas, sucesso, agora)
+    fonte.ultimo_erro = '' if sucesso else (erro or '')[:255]
+
+    if not sucesso:
+        fonte.intervalo_coleta = _limitar(padrao * 2 ** (fonte.falhas_consecutivas - 1))
+    else:
+        observado = intervalo_publicacao_observado(feed) if feed is not None else None
+        if observado:
+            if fonte.intervalo_publicacao:
+                observado = PESO_OBSERVACAO * observado + (1 - PESO_OBSERVACAO) * fonte.intervalo_publicacao
+            fonte.intervalo_publicacao = observado
+
+        if criadas:
+            alvo = fonte.intervalo_publicacao / 2 if fonte.intervalo_publicacao else padrao
+            fonte.intervalo_coleta = _limitar(alvo)
+        else:
+            teto = fonte.intervalo_publicacao * 2 if fonte.intervalo_publicacao else settings.NOTICIAS_COLETA_INTERVALO_MAX
+            fonte.intervalo_coleta = _limitar(min(fonte.intervalo_coleta * FATOR_RECUO_SEM_NOVIDADES, max(teto, fonte.intervalo_coleta)))
+
+    fonte.ultima_coleta_em = agora
+    fonte.proxima_coleta_em = agora + timedelta(seconds=fonte.intervalo_coleta)
+    if fonte.circuito_aberto_ate:
+        fonte.proxima_coleta_em = max(fonte.proxima_coleta_em, fonte.circuito_aberto_ate)
+    fonte.save(update_fields=[
+        'falhas_consecutivas', 'intervalo_coleta', 'intervalo_publicacao',
+        'ultima_coleta_em', 'proxima_coleta_em', 'circuito_aberto_ate', 'ultimo_erro',
+    ])
+
+
+def reservar_fontes_devidas(limite=None):
+    """
+    Seleciona as fontes ativas cuja próxima coleta já venceu e as reserva.
+
+    A reserva empurra `proxima_coleta_em` para frente, assim um tick seguinte
+    não despacha a mesma fonte enquanto a coleta anterior ainda está rodando.
+    Retorna a lista de ids reservados.
+    """
+    agora = timezone.now()
+    devidas = (
+        Fonte.objects.filter(ativo=True)
+        .filter(Q(proxima_coleta_em__isnull=True) | Q(proxima_coleta_em__lte=agora))
+        .order_by(F('proxima_coleta_em').asc(nulls_first=True), 'id')
+        .values_list('id', flat=True)
+    )
+    if limite:
+        devidas = devidas[:limite]
+    ids = list(devidas)
+    if ids:
+        Fonte.objects.filter(id__in=ids).update(
+            proxima_coleta_em=agora + timedelta(seconds=settings.NOTICIAS_COLETA_RESERVA)
+        )
+    return ids
+
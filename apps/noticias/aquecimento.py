@@ -0,0 +1,60 @@
+import logging
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.http import HttpRequest, QueryDict
+from django.urls import reverse
+
+from .models import Fonte
+from .views import CategoriasListView, NoticiasListView
+
+logger = logging.getLogger(__name__)
+
+
+class RequisicaoInterna(HttpRequest):
+    """GET montado no próprio processo, com o host/esquema públicos da API (para os links de paginação)."""
+
+    def __init__(self, caminho, parametros=None):
+        super().__init__()
+        self.method = 'GET'
+        self.path = self.path_info = caminho
+        self.GET = QueryDict(urlencode(parametros or {}))
+        self.META = {
+            'REQUEST_METHOD': 'GET',
+            'QUERY_STRING': self.GET.urlencode(),
+            'HTTP_HOST': settings.NOTICIAS_API_HOST,
+            'SERVER_NAME': settings.NOTICIAS_API_HOST,
+            'SERVER_PORT': '443' if settings.NOTICIAS_API_HTTPS else '80',
+        }
+
+    def _get_scheme(self):
+        return 'https' if settings.NOTICIAS_API_HTTPS else 'http'
+
+
+def aquecer_cache_api():
+    """
+    Pré-carrega no cache a primeira página de cada categoria (e a de categorias).
+
+    Chama as views direto, sem throttling: o aquecimento não pode gastar a
+    cota anônima (é tudo do mesmo "IP") nem levar 429 e deixar de cachear.
+    Devolve quantas respostas foram geradas.
+    """
+    categorias = (
+        Fonte.objects.filter(ativo=True, categoria_padrao__isnull=False)
+        .exclude(categoria_padrao='')
+        .values_list('categoria_padrao', flat=True)
+        .distinct()
+    )
+    filtros = [{}] + [{'categoria': categoria} for categoria in categorias]
+
+    lista = NoticiasListView.as_view(throttle_classes=[])
+    caminho = reverse('noticias-list')
+    aquecidas = 0
+    for filtro in filtros:
+        for paginacao in ({}, {'paginacao': 'cursor'}):
+            resposta = lista(RequisicaoInterna(caminho, {**filtro, **paginacao}))
+            if resposta.status_code != 200:
+                logger.warning(f'Aquecimento do cache: {caminho} {filtro} respondeu {resposta.status_code}')
+            aquecidas += 1
+    CategoriasListView.as_view(throttle_classes=[])(RequisicaoInterna(reverse('categorias-list')))
+    return aquecidas + 1
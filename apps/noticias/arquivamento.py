@@ -0,0 +1,138 @@
+import json
+import logging
+import zlib
+from collections import Counter
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .cache import invalidar_cache_api
+from .categorias import somar_noticias
+from .models import Noticia, NoticiaArquivada
+
+logger = logging.getLogger(__name__)
+
+# Campos que vão compactados em NoticiaArquivada.conteudo
+CAMPOS_COMPACTADOS = ('resumo', 'conteudo_completo', 'imagem', 'duplicata_de_id')
+
+
+def compactar(dados):
+    return zlib.compress(json.dumps(dados, ensure_ascii=False).encode(), 9)
+
+
+def descompactar(conteudo):
+    return json.loads(zlib.decompress(bytes(conteudo)).decode())
+
+
+def inicio_do_mes(momento, meses_atras=0):
+    """Meia-noite do dia 1 do mês de `momento`, recuado `meses_atras` meses."""
+    indice = momento.year * 12 + momento.month - 1 - meses_atras
+    return momento.replace(
+        year=indice // 12, month=indice % 12 + 1, day=1, hour=0, minute=0, second=0, microsecond=0
+    )
+
+
+def limite_retencao(meses=None):
+    """Notícias publicadas antes deste instante saem da tabela principal."""
+    meses = settings.NOTICIAS_RETENCAO_MESES if meses is None else meses
+    return inicio_do_mes(timezone.localtime(), meses)
+
+
+def arquivar_lote(ids):
+    """
+    Move um lote de notícias para NoticiaArquivada, em uma transação.
+
+    A remoção é um DELETE direto: o delete() do ORM carregaria cada objeto e
+    dispararia o post_delete (contagem e cache) uma vez por notícia. Por isso
+    o índice de categorias é ajustado aqui, uma vez por categoria, e as
+    duplicatas que apontavam para as arquivadas voltam a ser principais.
+
+    Só sai da tabela principal o que de fato está no arquivo: uma notícia que
+    conflita com outra já arquivada (mesmo link na mesma fonte) fica onde
+    está e é registrada no log. Retorna quantas foram movidas.
+    """
+    with transaction.atomic():
+        linhas = list(
+            Noticia.objects.filter(id__in=ids)
+            .select_for_update()
+            .values('id', 'fonte_id', 'titulo', 'categoria', 'link', 'link_hash', 'publicado_em', 'criado_em', *CAMPOS_COMPACTADOS)
+        )
+        if not linhas:
+            return 0
+        NoticiaArquivada.objects.bulk_create(
+            [
+                NoticiaArquivada(
+                    id=linha['id'],
+                    fonte_id=linha['fonte_id'],
+                    titulo=linha['titulo'],
+                    categoria=linha['categoria'],
+                    link=linha['link'],
+                    link_hash=linha['link_hash'],
+                    publicado_em=linha['publicado_em'],
+                    criado_em=linha['criado_em'],
+                    conteudo=compactar({campo: linha[campo] for campo in CAMPOS_COMPACTADOS}),
+                )
+                for linha in linhas
+            ],
+            ignore_conflicts=True,
+        )
+
+        arquivadas = set(
+            NoticiaArquivada.objects.filter(id__in=[linha['id'] for linha in linhas]).values_list('id', flat=True)
+        )
+        if len(arquivadas) < len(linhas):
+            faltando = sorted({linha['id'] for linha in linhas} - arquivadas)
+            logger.warning(f'{len(faltando)} notícias não foram arquivadas (conflito no arquivo): {faltando[:20]}')
+        if not arquivadas:
+            return 0
+
+        ids = list(arquivadas)
+        Noticia.objects.filter(duplicata_de_id__in=ids).update(duplicata_de=None)
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {Noticia._meta.db_table} WHERE id = ANY(%s)', [ids])
+
+        for categoria, total in Counter(linha['categoria'] for linha in linhas if linha['id'] in arquivadas).items():
+            somar_noticias(categoria, -total)
+    return len(arquivadas)
+
+
+def arquivar_noticias(meses=None, tamanho_lote=None):
+    """
+    Retenção: arquiva as notícias publicadas antes de `meses` meses completos.
+
+    Anda mês a mês a partir do mais antigo, em lotes de
+    NOTICIAS_ARQUIVAMENTO_LOTE, para manter as transações curtas e deixar o
+    autovacuum reaproveitar o espaço aos poucos. Retorna o total arquivado e
+    quantas notícias saíram de cada mês ('AAAA-MM').
+    """
+    limite = limite_retencao(meses)
+    tamanho_lote = tamanho_lote or settings.NOTICIAS_ARQUIVAMENTO_LOTE
+
+    mais_antiga = Noticia.objects.filter(publicado_em__lt=limite).order_by('publicado_em').first()
+    if mais_antiga is None:
+        return {'arquivadas': 0, 'meses': {}}
+
+    inicio = inicio_do_mes(timezone.localtime(mais_antiga.publicado_em))
+    por_mes = {}
+    while inicio < limite:
+        fim = inicio_do_mes(inicio, -1)
+        mes = Noticia.objects.filter(publicado_em__gte=inicio, publicado_em__lt=fim).order_by('id')
+        arquivadas = 0
+        ultimo_id = 0
+        while True:
+            # Avança por id: as que não puderam ser arquivadas não voltam no próximo lote
+            ids = list(mes.filter(id__gt=ultimo_id).values_list('id', flat=True)[:tamanho_lote])
+            if not ids:
+                break
+            arquivadas += arquivar_lote(ids)
+            ultimo_id = ids[-1]
+        if arquivadas:
+            por_mes[inicio.strftime('%Y-%m')] = arquivadas
+            logger.info(f'{arquivadas} notícias de {inicio:%m/%Y} arquivadas')
+        inicio = fim
+
+    total = sum(por_mes.values())
+    if total:
+        invalidar_cache_api()
+    return {'arquivadas': total, 'meses': por_mes}
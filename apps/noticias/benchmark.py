@@ -0,0 +1,236 @@
+"""
+Corpus sintético e servidor HTTP local para medir a ingestão sem internet.
+
+Usado pelo comando benchmark_ingestao_noticias: os feeds (RSS ou Atom), as
+páginas dos artigos e as imagens são gerados de forma determinística a
+partir de uma semente, então duas execuções com os mesmos parâmetros medem
+exatamente o mesmo trabalho.
+"""
+import io
+import random
+import re
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from xml.sax.saxutils import escape
+
+from PIL import Image
+
+PALAVRAS = (
+    'receita federal contribuinte imposto renda declaração prazo empresa simples nacional '
+    'contabilidade balanço fiscal tributo alíquota reforma tributária governo mercado economia '
+    'juros inflação banco central crédito folha pagamento esocial obrigação acessória nota '
+    'eletrônica sistema digital escrituração lucro presumido real regime apuração débito'
+).split()
+
+FORMATOS = ('rss', 'atom', 'misto')
+
+_RE_FEED = re.compile(r'^/feeds/(\d+)\.xml$')
+_RE_ARTIGO = re.compile(r'^/artigos/(\d+)/(\d+)\.html$')
+_RE_IMAGEM = re.compile(r'^/imagens/(\d+)\.jpg$')
+
+
+class Corpus:
+    """
+    Feeds e artigos gerados: `fontes` feeds com `entradas` itens cada.
+
+    Uma fração `fracao_raspagem` dos itens traz só um resumo curto (força a
+    raspagem da página); os demais trazem o texto inteiro no feed. A imagem
+    de cada item alterna entre enclosure, media:content, <img> no conteúdo
+    e nenhuma, cobrindo os caminhos de extrair_imagem_feed.
+    """
+
+    def __init__(self, fontes=10, entradas=50, tamanho_artigo=5000, fracao_raspagem=0.5, formato='misto', semente=42):
+        self.fontes = fontes
+        self.entradas = entradas
+        self.tamanho_artigo = tamanho_artigo
+        self.fracao_raspagem = fracao_raspagem
+        self.formato = formato
+        self.semente = semente
+        self.referencia = datetime(2026, 1, 1, 12, tzinfo=timezone.utc)
+        self._imagem = None
+
+    def _aleatorio(self, *chave):
+        return random.Random('-'.join(str(parte) for parte in (self.semente, *chave)))
+
+    def _frase(self, rnd, palavras):
+        return ' '.join(rnd.choice(PALAVRAS) for _ in range(palavras)).capitalize() + '.'
+
+    def paragrafos(self, fonte, indice):
+        rnd = self._aleatorio('texto', fonte, indice)
+        paragrafos, tamanho = [], 0
+        while tamanho < self.tamanho_artigo:
+            paragrafo = ' '.join(self._frase(rnd, rnd.randint(8, 20)) for _ in range(rnd.randint(3, 6)))
+            paragrafos.append(paragrafo)
+            tamanho += len(paragrafo)
+        return paragrafos
+
+    def item(self, fonte, indice, base_url):
+        rnd = self._aleatorio('item', fonte, indice)
+        link = f'{base_url}/artigos/{fonte}/{indice}.html'
+        imagem = f'{base_url}/imagens/{(fonte * self.entradas + indice) % 20}.jpg'
+        completo = rnd.random() >= self.fracao_raspagem
+        html = ''.join(f'<p>{escape(p)}</p>' for p in self.paragrafos(fonte, indice)) if completo else ''
+        modo_imagem = indice % 4
+        if modo_imagem == 2:
+            html = f'<img src="{imagem}" alt="">' + (html or f'<p>{escape(self._frase(rnd, 6))}</p>')
+        return {
+            'titulo': self._frase(rnd, rnd.randint(6, 12)),
+            'resumo': self._frase(rnd, rnd.randint(10, 20)),
+            'conteudo': html,
+            'link': link,
+            'publicado_em': self.referencia - timedelta(minutes=10 * indice + fonte),
+            'imagem': imagem,
+            'modo_imagem': ('enclosure', 'media', 'html', None)[modo_imagem],
+        }
+
+    def formato_da_fonte(self, fonte):
+        if self.formato == 'misto':
+            return ('rss', 'atom')[fonte % 2]
+        return self.formato
+
+    def feed(self, fonte, base_url):
+        itens = [self.item(fonte, indice, base_url) for indice in range(self.entradas)]
+        if self.formato_da_fonte(fonte) == 'atom':
+            return self._atom(fonte, itens, base_url).encode(), 'application/atom+xml'
+        return self._rss(fonte, itens, base_url).encode(), 'application/rss+xml'
+
+    def _rss(self, fonte, itens, base_url):
+        partes = []
+        for item in itens:
+            extra = ''
+            if item['conteudo']:
+                extra += f'<content:encoded><![CDATA[{item["conteudo"]}]]></content:encoded>'
+            if item['modo_imagem'] == 'enclosure':
+                extra += f'<enclosure url="{item["imagem"]}" type="image/jpeg" length="0"/>'
+            elif item['modo_imagem'] == 'media':
+                extra += f'<media:content url="{item["imagem"]}" type="image/jpeg" medium="image"/>'
+            partes.append(
+                f'<item><title>{escape(item["titulo"])}</title><link>{item["link"]}</link>'
+                f'<guid>{item["link"]}</guid><pubDate>{format_datetime(item["publicado_em"])}</pubDate>'
+                f'<description>{escape(item["resumo"])}</description>{extra}</item>'
+            )
+        return (
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            '<rss version="2.0" xmlns:content="http://purl.org/rss/1.0/modules/content/" '
+            'xmlns:media="http://search.yahoo.com/mrss/"><channel>'
+            f'<title>Fonte {fonte}</title><link>{base_url}/</link><description>Benchmark</description>'
+            f'{"".join(partes)}</channel></rss>'
+        )
+
+    def _atom(self, fonte, itens, base_url):
+        partes = []
+        for item in itens:
+            extra = ''
+            if item['conteudo']:
+                extra += f'<content type="html">{escape(item["conteudo"])}</content>'
+            if item['modo_imagem'] == 'enclosure':
+                extra += f'<link rel="enclosure" type="image/jpeg" href="{item["imagem"]}"/>'
+            elif item['modo_imagem'] == 'media':
+                extra += f'<media:content url="{item["imagem"]}" type="image/jpeg" medium="image"/>'
+            data = item['publicado_em'].isoformat()
+            partes.append(
+                f'<entry><title>{escape(item["titulo"])}</title><link rel="alternate" href="{item["link"]}"/>'
+                f'<id>{item["link"]}</id><published>{data}</published><updated>{data}</updated>'
+                f'<summary>{escape(item["resumo"])}</summary>{extra}</entry>'
+            )
+        return (
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            '<feed xmlns="http://www.w3.org/2005/Atom" xmlns:media="http://search.yahoo.com/mrss/">'
+            f'<title>Fonte {fonte}</title><id>{base_url}/feeds/{fonte}.xml</id>'
+            f'<updated>{self.referencia.isoformat()}</updated>{"".join(partes)}</feed>'
+        )
+
+    def artigo(self, fonte, indice):
+        rnd = self._aleatorio('item', fonte, indice)
+        titulo = self._frase(rnd, rnd.randint(6, 12))
+        corpo = ''.join(f'<p>{escape(p)}</p>' for p in self.paragrafos(fonte, indice))
+        return (
+            '<!DOCTYPE html><html><head><meta charset="utf-8">'
+            f'<title>{escape(titulo)}</title><script>var analytics = 1;</script></head><body>'
+            '<nav><a href="/">Início</a><a href="/economia">Economia</a></nav>'
+            f'<main><article><h1>{escape(titulo)}</h1><div class="ads">Publicidade</div>{corpo}</article></main>'
+            '<aside>Leia também</aside><footer>Rodapé</footer></body></html>'
+        ).encode()
+
+    def imagem(self):
+        if self._imagem is None:
+            saida = io.BytesIO()
+            Image.new('RGB', (1200, 800), (40, 90, 160)).save(saida, 'JPEG', quality=85)
+            self._imagem = saida.getvalue()
+        return self._imagem
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        servidor = self.server
+        if servidor.latencia:
+            time.sleep(servidor.latencia)
+        base_url = f'http://{self.headers.get("Host")}'
+        caminho = self.path.split('?', 1)[0]
+
+        if encontrado := _RE_FEED.match(caminho):
+            corpo, tipo = servidor.corpus.feed(int(encontrado.group(1)), base_url)
+        elif encontrado := _RE_ARTIGO.match(caminho):
+            corpo, tipo = servidor.corpus.artigo(int(encontrado.group(1)), int(encontrado.group(2))), 'text/html; charset=utf-8'
+        elif _RE_IMAGEM.match(caminho):
+            corpo, tipo = servidor.corpus.imagem(), 'image/jpeg'
+        else:
+            self.send_error(404)
+            return
+
+        servidor.contar(caminho)
+        self.send_response(200)
+        self.send_header('Content-Type', tipo)
+        self.send_header('Content-Length', str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class ServidorLocal:
+    """
+    Servidor HTTP em 127.0.0.1 (porta livre) que responde o corpus, com
+    `latencia` segundos de atraso por requisição. Use como context manager.
+    """
+
+    def __init__(self, corpus, latencia=0.0):
+        self.corpus = corpus
+        self.latencia = latencia
+        self.requisicoes = {'feeds': 0, 'artigos': 0, 'imagens': 0}
+        self._lock = threading.Lock()
+        self._httpd = None
+
+    @property
+    def base_url(self):
+        return f'http://127.0.0.1:{self._httpd.server_address[1]}'
+
+    def url_feed(self, fonte):
+        return f'{self.base_url}/feeds/{fonte}.xml'
+
+    def url_artigo(self, fonte, indice):
+        return f'{self.base_url}/artigos/{fonte}/{indice}.html'
+
+    def contar(self, caminho):
+        tipo = caminho.split('/')[1]
+        with self._lock:
+            self.requisicoes[tipo] += 1
+
+    def __enter__(self):
+        self._httpd = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+        self._httpd.daemon_threads = True
+        self._httpd.corpus = self.corpus
+        self._httpd.latencia = self.latencia
+        self._httpd.contar = self.contar
+        threading.Thread(target=self._httpd.serve_forever, name='noticias-benchmark', daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self._httpd.shutdown()
+        self._httpd.server_close()
@@ -0,0 +1,77 @@
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db.models import Case, F, FloatField, Func, TextField, Value, When
+from django.db.models.functions import Now
+from rest_framework import filters
+
+CONFIGURACAO = 'portuguese'
+
+# Em quantos dias a relevância de uma notícia cai pela metade na ordenação da busca
+MEIA_VIDA_DIAS = 7
+
+
+def vetor_busca(noticias):
+    """
+    Expressão do tsvector de Noticia.busca: título (peso A), resumo (B) e
+    conteúdo completo (C), com o dicionário do português.
+
+    resumo e conteudo_completo ficam compactados no banco (ver campos.py),
+    então entram como valores vindos do Python, um CASE por id, para que o
+    lote inteiro seja atualizado com um único UPDATE.
+    """
+    def por_id(campo):
+        return Case(
+            *[When(pk=noticia.pk, then=Value(getattr(noticia, campo) or '')) for noticia in noticias],
+            default=Value(''),
+            output_field=TextField(),
+        )
+
+    return (
+        SearchVector('titulo', weight='A', config=CONFIGURACAO)
+        + SearchVector(por_id('resumo'), weight='B', config=CONFIGURACAO)
+        + SearchVector(por_id('conteudo_completo'), weight='C', config=CONFIGURACAO)
+    )
+
+
+def atualizar_busca(queryset, noticias, tamanho_lote=100):
+    """Recalcula `busca` das notícias informadas (já gravadas, com pk)."""
+    noticias = list(noticias)
+    for inicio in range(0, len(noticias), tamanho_lote):
+        lote = noticias[inicio:inicio + tamanho_lote]
+        queryset.filter(pk__in=[noticia.pk for noticia in lote]).update(busca=vetor_busca(lote))
+
+
+def consulta(termo):
+    # websearch aceita a sintaxe que o usuário já conhece: "frase exata", -exclusão, OR
+    return SearchQuery(termo, config=CONFIGURACAO, search_type='websearch')
+
+
+def buscar(queryset, termo):
+    """Filtra pelo índice GIN de `busca` e anota a relevância ponderada pela recência."""
+    query = consulta(termo)
+    idade_dias = Func(
+        Now() - F('publicado_em'),
+        template='EXTRACT(EPOCH FROM %(expressions)s) / 86400.0',
+        output_field=FloatField(),
+    )
+    return queryset.filter(busca=query).annotate(
+        relevancia=SearchRank(F('busca'), query) / (1.0 + idade_dias / MEIA_VIDA_DIAS)
+    )
+
+
+class BuscaTextoCompletoFilter(filters.SearchFilter):
+    """
+    Substitui o SearchFilter (ILIKE '%termo%') pela busca textual do Postgres.
+
+    Usa o mesmo parâmetro ?search=. Sem ?ordering= explícito, os resultados
+    vêm por relevância e recência; por isso este filtro deve ficar depois do
+    OrderingFilter em filter_backends.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        termo = request.query_params.get(self.search_param, '').strip()
+        if not termo:
+            return queryset
+        queryset = buscar(queryset, termo)
+        if not request.query_params.get(filters.OrderingFilter.ordering_param):
+            queryset = queryset.order_by('-relevancia', '-publicado_em')
+        return queryset
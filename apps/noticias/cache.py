@@ -0,0 +1,130 @@
+import hashlib
+import logging
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Max
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.mixins import ListModelMixin
+from rest_framework.response import Response
+
+logger = logging.getLogger(__name__)
+
+PREFIXO = 'noticias:api'
+CHAVE_VERSAO = f'{PREFIXO}:versao'
+
+# Parâmetros que não mudam a resposta e não devem separar entradas do cache
+PARAMETROS_IGNORADOS = {'format'}
+
+
+def versao_atual():
+    """Versão do namespace de cache da API; muda a cada importação com novidades."""
+    versao = cache.get(CHAVE_VERSAO)
+    if versao is None:
+        cache.add(CHAVE_VERSAO, 1, timeout=None)
+        versao = cache.get(CHAVE_VERSAO) or 1
+    return versao
+
+
+def invalidar_cache_api():
+    """
+    Invalida de uma vez todas as respostas cacheadas, trocando a versão.
+
+    As entradas antigas não são apagadas: ficam órfãs e expiram pelo TTL.
+    """
+    try:
+        return cache.incr(CHAVE_VERSAO)
+    except ValueError:
+        cache.set(CHAVE_VERSAO, 2, timeout=None)
+        return 2
+
+
+def parametros_normalizados(request):
+    """Query string em forma canônica: chaves e valores ordenados, sem vazios e sem page=1."""
+    parametros = []
+    for chave, valores in sorted(request.query_params.lists()):
+        if chave in PARAMETROS_IGNORADOS:
+            continue
+        for valor in sorted(valores):
+            if valor == '' or (chave == 'page' and valor == '1'):
+                continue
+            parametros.append((chave, valor))
+    return urlencode(parametros)
+
+
+def chave_resposta(view, request):
+    # O host entra na chave porque os links de paginação são absolutos
+    partes = [
+        view.__class__.__name__,
+        request.get_host(),
+        ','.join(f'{k}={v}' for k, v in sorted(view.kwargs.items())),
+        parametros_normalizados(request),
+    ]
+    digest = hashlib.sha1('|'.join(partes).encode()).hexdigest()
+    return f'{PREFIXO}:v{versao_atual()}:{digest}'
+
+
+class RespostaCacheadaMixin:
+    """
+    Cache das respostas GET no django-redis, por view + query string normalizada.
+
+    As views públicas de notícias não têm nada por usuário, então a mesma
+    entrada serve para todo mundo. O cache é invalidado pela troca de versão
+    (invalidar_cache_api) sempre que uma importação cria ou altera notícias.
+    """
+    cache_timeout = None
+
+    def get(self, request, *args, **kwargs):
+        chave = chave_resposta(self, request)
+        dados = cache.get(chave)
+        if dados is not None:
+            return Response(dados)
+
+        response = super().get(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(chave, response.data, timeout=self.cache_timeout or settings.NOTICIAS_API_CACHE_TTL)
+        return response
+
+
+def agregado_etag(queryset):
+    """Maior id/criado_em do queryset: o que muda a ETag de uma listagem."""
+    return queryset.order_by().aggregate(ultimo_id=Max('id'), ultimo_criado_em=Max('criado_em'))
+
+
+class ETagMixin:
+    """
+    ETag forte e 304 Not Modified nas views públicas de notícias.
+
+    A impressão é calculada sem serializar nada: versão do namespace de cache
+    (que muda a cada escrita), parâmetros normalizados e, nas listagens, o
+    maior id/criado_em do queryset filtrado (um único SELECT com MAX). Se o
+    cliente manda o mesmo valor em If-None-Match, responde 304 sem corpo.
+    Deve vir antes de RespostaCacheadaMixin na herança.
+    """
+
+    def impressao_etag(self, request):
+        partes = [
+            self.__class__.__name__,
+            str(versao_atual()),
+            ','.join(f'{k}={v}' for k, v in sorted(self.kwargs.items())),
+            parametros_normalizados(request),
+        ]
+        if isinstance(self, ListModelMixin) and self.queryset is not None:
+            agregado = agregado_etag(self.filter_queryset(self.get_queryset()))
+            partes += [str(agregado['ultimo_id']), str(agregado['ultimo_criado_em'])]
+        return '|'.join(partes)
+
+    def get(self, request, *args, **kwargs):
+        etag = quote_etag(hashlib.sha1(self.impressao_etag(request).encode()).hexdigest())
+
+        # If-None-Match usa comparação fraca: W/"x" e "x" são a mesma representação
+        recebidas = [tag.removeprefix('W/') for tag in parse_etags(request.headers.get('If-None-Match', ''))]
+        if '*' in recebidas or etag in recebidas:
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+
+        response = super().get(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            response['ETag'] = etag
+        return response
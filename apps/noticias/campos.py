@@ -0,0 +1,74 @@
+import zlib
+
+from django.db import models
+
+try:
+    import zstandard
+except ImportError:  # zstd é opcional; sem ele grava com zlib
+    zstandard = None
+
+# Primeiro byte do valor gravado: diz como ler o restante
+FORMATO_TEXTO = b'\x00'  # UTF-8 puro (valores curtos, em que compactar não compensa)
+FORMATO_ZLIB = b'\x01'
+FORMATO_ZSTD = b'\x02'
+
+TAMANHO_MINIMO = 256  # bytes; abaixo disso grava sem compactar
+NIVEL_ZLIB = 6
+NIVEL_ZSTD = 10
+
+
+def compactar_texto(texto, formato=None):
+    """Texto -> bytes com o marcador de formato na frente."""
+    dados = texto.encode()
+    if len(dados) < TAMANHO_MINIMO:
+        return FORMATO_TEXTO + dados
+    formato = formato or (FORMATO_ZSTD if zstandard else FORMATO_ZLIB)
+    if formato == FORMATO_ZSTD:
+        return FORMATO_ZSTD + zstandard.ZstdCompressor(level=NIVEL_ZSTD).compress(dados)
+    return FORMATO_ZLIB + zlib.compress(dados, NIVEL_ZLIB)
+
+
+def descompactar_texto(valor):
+    valor = bytes(valor)
+    formato, dados = valor[:1], valor[1:]
+    if formato == FORMATO_TEXTO:
+        return dados.decode()
+    if formato == FORMATO_ZLIB:
+        return zlib.decompress(dados).decode()
+    if formato == FORMATO_ZSTD:
+        if zstandard is None:
+            raise RuntimeError('Valor gravado com zstd, mas o pacote zstandard não está instalado')
+        return zstandard.ZstdDecompressor().decompress(dados).decode()
+    raise ValueError(f'Formato de texto compactado desconhecido: {formato!r}')
+
+
+class TextoCompactadoField(models.TextField):
+    """
+    TextField gravado compactado em uma coluna bytea.
+
+    Compacta no save (zstd se o pacote zstandard estiver instalado, senão
+    zlib) e descompacta na leitura; no Python o valor é sempre str. Como o
+    Postgres só enxerga bytes, a coluna não serve para filtros de texto
+    (icontains, SearchVector etc.): esses cálculos usam o valor em Python.
+    """
+    description = 'Texto compactado (zstd/zlib)'
+
+    def get_internal_type(self):
+        return 'BinaryField'
+
+    def from_db_value(self, value, expression, connection):
+        if value is None:
+            return None
+        return descompactar_texto(value)
+
+    def to_python(self, value):
+        if isinstance(value, (bytes, memoryview)):
+            return descompactar_texto(value)
+        return super().to_python(value)
+
+    def get_db_prep_value(self, value, connection, prepared=False):
+        if not prepared:
+            value = self.get_prep_value(value)
+        if value is None:
+            return None
+        return connection.Database.Binary(compactar_texto(value))
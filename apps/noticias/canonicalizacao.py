@@ -0,0 +1,61 @@
+import hashlib
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Parâmetros de rastreamento: não mudam o conteúdo da página
+PARAMETROS_RASTREAMENTO = {
+    'fbclid', 'gclid', 'dclid', 'msclkid', 'yclid', 'igshid', 'mc_cid', 'mc_eid',
+    '_ga', '_gl', 'ref_src', 'cmpid', 'xtor',
+}
+PREFIXOS_RASTREAMENTO = ('utm_',)
+
+PORTAS_PADRAO = {'http': 80, 'https': 443}
+
+
+def _rastreamento(parametro):
+    parametro = parametro.lower()
+    return parametro in PARAMETROS_RASTREAMENTO or parametro.startswith(PREFIXOS_RASTREAMENTO)
+
+
+def canonicalizar_url(url):
+    """
+    Forma canônica de um link de notícia, usada na deduplicação e nos caches.
+
+    Variações que apontam para a mesma página viram a mesma URL: http passa a
+    https, host em minúsculas e sem porta padrão, sem fragmento, sem
+    parâmetros de rastreamento (utm_*, fbclid...) e com os demais parâmetros
+    em ordem alfabética. O caminho é mantido como veio (maiúsculas e barra
+    final podem ter significado no site).
+    """
+    partes = urlsplit(url.strip())
+    esquema = partes.scheme.lower()
+    if esquema == 'http':
+        esquema = 'https'
+
+    host = (partes.hostname or '').rstrip('.')
+    try:
+        porta = partes.port
+    except ValueError:  # porta inválida: fica só o host
+        porta = None
+    if porta and porta != PORTAS_PADRAO.get(partes.scheme.lower()):
+        host = f'{host}:{porta}'
+    if partes.username or partes.password:
+        credenciais = partes.username or ''
+        if partes.password:
+            credenciais += f':{partes.password}'
+        host = f'{credenciais}@{host}'
+
+    parametros = sorted(
+        (chave, valor)
+        for chave, valor in parse_qsl(partes.query, keep_blank_values=True)
+        if not _rastreamento(chave)
+    )
+    return urlunsplit((esquema, host, partes.path or '/', urlencode(parametros), ''))
+
+
+def hash_url(url):
+    """
+    Hash de largura fixa da URL canônica: os 8 primeiros bytes do SHA-256,
+    como inteiro com sinal (cabe em um BigIntegerField).
+    """
+    digest = hashlib.sha256(canonicalizar_url(url).encode()).digest()
+    return int.from_bytes(digest[:8], 'big', signed=True)
@@ -0,0 +1,89 @@
+from django.db.models import Count, F, Max, Q
+from django.db.models.functions import Greatest
+
+from .models import Categoria, Fonte, Noticia
+
+
+def registrar_noticias(ids):
+    """
+    Soma ao índice as notícias recém-criadas, agrupadas por categoria.
+
+    Uma consulta agregada sobre os ids novos e um UPDATE por categoria
+    afetada; nenhuma varredura da tabela de notícias.
+    """
+    grupos = (
+        Noticia.objects.filter(id__in=ids)
+        .exclude(categoria__isnull=True)
+        .exclude(categoria='')
+        .values('categoria')
+        .annotate(total=Count('id'), ultima=Max('publicado_em'))
+        .order_by()
+    )
+    for grupo in grupos:
+        somar_noticias(grupo['categoria'], grupo['total'], grupo['ultima'])
+
+
+def descontar_noticias_da_fonte(fonte):
+    """Tira do índice, de uma vez por categoria, as notícias de uma fonte que vai ser apagada."""
+    grupos = (
+        Noticia.objects.filter(fonte=fonte)
+        .exclude(categoria__isnull=True)
+        .exclude(categoria='')
+        .values('categoria')
+        .annotate(total=Count('id'))
+        .order_by()
+    )
+    for grupo in grupos:
+        somar_noticias(grupo['categoria'], -grupo['total'])
+
+
+def somar_noticias(nome, quantidade, publicado_em=None):
+    if not nome or not nome.strip():
+        return
+    Categoria.objects.get_or_create(nome=nome)
+    campos = {'total_noticias': Greatest(F('total_noticias') + quantidade, 0)}
+    if publicado_em is not None:
+        # GREATEST do Postgres ignora NULL: funciona também na primeira notícia
+        campos['ultima_publicacao_em'] = Greatest(F('ultima_publicacao_em'), publicado_em)
+    Categoria.objects.filter(nome=nome).update(**campos)
+
+
+def atualizar_fontes_ativas():
+    """Recalcula quantas fontes ativas cada categoria tem (a tabela de fontes é pequena)."""
+    contagens = dict(
+        Fonte.objects.filter(ativo=True, categoria_padrao__isnull=False)
+        .exclude(categoria_padrao='')
+        .values_list('categoria_padrao')
+        .annotate(total=Count('id'))
+        .order_by()
+    )
+    for nome in contagens:
+        Categoria.objects.get_or_create(nome=nome)
+    Categoria.objects.exclude(nome__in=list(contagens)).update(fontes_ativas=0)
+    for nome, total in contagens.items():
+        Categoria.objects.filter(nome=nome).update(fontes_ativas=total)
+
+
+def reconstruir_indice():
+    """Recalcula o índice inteiro a partir das tabelas (uso manual ou após limpezas)."""
+    grupos = (
+        Noticia.objects.exclude(categoria__isnull=True)
+        .exclude(categoria='')
+        .values('categoria')
+        .annotate(total=Count('id'), ultima=Max('publicado_em'))
+        .order_by()
+    )
+    vistos = set()
+    for grupo in grupos:
+        Categoria.objects.update_or_create(
+            nome=grupo['categoria'],
+            defaults={'total_noticias': grupo['total'], 'ultima_publicacao_em': grupo['ultima']},
+        )
+        vistos.add(grupo['categoria'])
+    Categoria.objects.exclude(nome__in=vistos).update(total_noticias=0, ultima_publicacao_em=None)
+    atualizar_fontes_ativas()
+
+
+def listar_categorias():
+    """Categorias com alguma fonte ativa ou alguma notícia, em ordem alfabética."""
+    return Categoria.objects.filter(Q(fontes_ativas__gt=0) | Q(total_noticias__gt=0)).order_by('nome')
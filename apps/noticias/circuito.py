@@ -0,0 +1,41 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+# Estados do disjuntor de uma fonte ou de um domínio raspado
+FECHADO = 'fechado'  # funcionando: tenta normalmente
+ABERTO = 'aberto'  # falhou NOTICIAS_CIRCUITO_FALHAS vezes seguidas: não tenta até `aberto_ate`
+SONDA = 'sonda'  # o prazo venceu: uma única tentativa, com timeout curto, decide se fecha ou reabre
+
+
+def estado(falhas, aberto_ate, agora=None):
+    if falhas < settings.NOTICIAS_CIRCUITO_FALHAS or aberto_ate is None:
+        return FECHADO
+    if (agora or timezone.now()) < aberto_ate:
+        return ABERTO
+    return SONDA
+
+
+def aberto_ate(falhas, agora=None):
+    """
+    Até quando o circuito fica aberto depois de `falhas` falhas seguidas.
+
+    Recuo exponencial: NOTICIAS_CIRCUITO_RECUO_INICIAL na abertura, dobrando
+    a cada sonda que falha, até NOTICIAS_CIRCUITO_RECUO_MAXIMO. Cada falha
+    além do limite conta como uma sonda, então quem registra falhas em lote
+    deve parar de contar assim que o circuito abre (ver registrar_extracoes).
+    """
+    excesso = max(falhas - settings.NOTICIAS_CIRCUITO_FALHAS, 0)
+    segundos = min(settings.NOTICIAS_CIRCUITO_RECUO_INICIAL * 2 ** excesso, settings.NOTICIAS_CIRCUITO_RECUO_MAXIMO)
+    return (agora or timezone.now()) + timedelta(seconds=segundos)
+
+
+def registrar(falhas, sucesso, agora=None):
+    """Novo (falhas_consecutivas, circuito_aberto_ate) depois de uma tentativa."""
+    if sucesso:
+        return 0, None
+    falhas += 1
+    if falhas < settings.NOTICIAS_CIRCUITO_FALHAS:
+        return falhas, None
+    return falhas, aberto_ate(falhas, agora)
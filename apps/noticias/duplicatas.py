@@ -0,0 +1,111 @@
+import hashlib
+import re
+import unicodedata
+from datetime import timedelta
+
+from django.conf import settings
+
+from .cache import invalidar_cache_api
+from .models import Noticia
+
+BITS = 64
+BANDAS = 4
+BITS_POR_BANDA = BITS // BANDAS
+
+_RE_TAGS = re.compile(r'<[^>]+>')
+_RE_PALAVRAS = re.compile(r'\w+')
+
+
+def _palavras(texto):
+    texto = _RE_TAGS.sub(' ', texto or '')
+    texto = unicodedata.normalize('NFKD', texto.lower())
+    texto = ''.join(c for c in texto if not unicodedata.combining(c))
+    return _RE_PALAVRAS.findall(texto)
+
+
+def simhash(texto):
+    """
+    SimHash de 64 bits do texto (pares de palavras como características).
+
+    Textos quase iguais geram impressões que diferem em poucos bits. Devolve
+    um inteiro com sinal, que cabe em um BigIntegerField.
+    """
+    palavras = _palavras(texto)
+    caracteristicas = [' '.join(par) for par in zip(palavras, palavras[1:])] or palavras
+    if not caracteristicas:
+        return None
+
+    pesos = [0] * BITS
+    for caracteristica in caracteristicas:
+        valor = int.from_bytes(hashlib.blake2b(caracteristica.encode(), digest_size=8).digest(), 'big')
+        for bit in range(BITS):
+            pesos[bit] += 1 if valor >> bit & 1 else -1
+
+    impressao = sum(1 << bit for bit in range(BITS) if pesos[bit] > 0)
+    return impressao - (1 << BITS) if impressao >= 1 << (BITS - 1) else impressao
+
+
+def bandas(impressao):
+    """
+    Divide a impressão em 4 faixas de 16 bits, cada uma marcada com seu índice.
+
+    Pelo princípio da casa dos pombos, duas impressões com distância de
+    Hamming até 3 têm pelo menos uma faixa idêntica; assim os candidatos saem
+    de uma busca no índice GIN (`&&`) em vez de comparar par a par.
+    """
+    sem_sinal = impressao & ((1 << BITS) - 1)
+    mascara = (1 << BITS_POR_BANDA) - 1
+    return [indice << BITS_POR_BANDA | (sem_sinal >> (indice * BITS_POR_BANDA) & mascara) for indice in range(BANDAS)]
+
+
+def distancia(a, b):
+    return bin((a ^ b) & ((1 << BITS) - 1)).count('1')
+
+
+def calcular_impressao(noticia):
+    """Preenche simhash/simhash_bandas a partir de titulo + conteudo_completo."""
+    noticia.simhash = simhash(f'{noticia.titulo} {noticia.conteudo_completo or noticia.resumo or ""}')
+    noticia.simhash_bandas = bandas(noticia.simhash) if noticia.simhash is not None else None
+
+
+def marcar_duplicatas(noticia_ids):
+    """
+    Liga cada notícia nova à notícia original da mesma história, se houver.
+
+    Os candidatos são notícias principais (sem duplicata_de) de outras fontes,
+    publicadas dentro de NOTICIAS_DUPLICATAS_JANELA_DIAS, que compartilham
+    alguma faixa do SimHash; vira duplicata quem estiver a até
+    NOTICIAS_DUPLICATAS_DISTANCIA bits da mais antiga delas. Retorna quantas foram marcadas.
+    """
+    janela = timedelta(days=settings.NOTICIAS_DUPLICATAS_JANELA_DIAS)
+    limite = settings.NOTICIAS_DUPLICATAS_DISTANCIA
+
+    noticias = list(
+        Noticia.objects.filter(id__in=noticia_ids, duplicata_de__isnull=True, simhash__isnull=False)
+        .only('id', 'fonte', 'simhash', 'simhash_bandas', 'publicado_em', 'duplicata_de')
+        .order_by('id')
+    )
+    marcadas = 0
+    for noticia in noticias:
+        candidatos = (
+            Noticia.objects.filter(
+                simhash_bandas__overlap=noticia.simhash_bandas,
+                duplicata_de__isnull=True,
+                publicado_em__range=(noticia.publicado_em - janela, noticia.publicado_em + janela),
+                id__lt=noticia.id,
+            )
+            # Só duplicatas entre fontes: itens parecidos da mesma fonte continuam separados
+            .exclude(fonte_id=noticia.fonte_id)
+            .order_by('id')
+            .values_list('id', 'simhash')
+        )
+        for candidato_id, candidato_simhash in candidatos:
+            if distancia(noticia.simhash, candidato_simhash) <= limite:
+                # Grava na hora: as próximas do lote não podem escolher esta como original
+                Noticia.objects.filter(pk=noticia.pk).update(duplicata_de_id=candidato_id)
+                marcadas += 1
+                break
+
+    if marcadas:
+        invalidar_cache_api()
+    return marcadas
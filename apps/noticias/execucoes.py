@@ -0,0 +1,158 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Avg, Count, F, Max, Q, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import ImportRun, ImportRunFonte
+
+
+def iniciar_execucao(import_run_id, total_fontes, task_id=''):
+    """
+    Marca o início de uma importação.
+
+    Usa a ImportRun criada pela ação do admin, se houver, ou cria uma nova
+    para as coletas do agendamento.
+    """
+    if import_run_id:
+        execucao = ImportRun.objects.get(pk=import_run_id)
+    else:
+        execucao = ImportRun(origem='agendada')
+    execucao.status = ImportRun.PROCESSANDO
+    execucao.total_fontes = total_fontes
+    execucao.task_id = task_id or execucao.task_id
+    execucao.iniciado_em = timezone.now()
+    execucao.save()
+    return execucao
+
+
+def registrar_fonte(execucao_id, fonte, resultado, contagens=None, tempo_parse=0, tempo_persistencia=0):
+    """
+    Grava a telemetria de uma fonte e atualiza o progresso da execução.
+
+    `resultado` é o dict de baixar_feed e `contagens` o de importar_entradas
+    (ausente quando o download falhou ou o feed não mudou). Uma nova
+    tentativa da mesma fonte sobrescreve a linha anterior, e os totais da
+    execução são recalculados a partir das linhas; os UPDATEs ficam visíveis
+    no admin na hora.
+    """
+    contagens = contagens or {}
+    registro, _ = ImportRunFonte.objects.update_or_create(
+        execucao_id=execucao_id,
+        fonte=fonte,
+        defaults={
+            'nome_fonte': fonte.nome,
+            'bytes': resultado['bytes'],
+            'latencia': resultado['latencia'],
+            'nao_modificado': resultado['nao_modificado'],
+            'tempo_parse': tempo_parse,
+            'tempo_persistencia': tempo_persistencia,
+            'entradas_vistas': contagens.get('vistas', 0),
+            'criadas': contagens.get('criadas', 0),
+            'ignoradas': contagens.get('ignoradas', 0),
+            'puladas': contagens.get('puladas', 0),
+            'erro': resultado['erro'] or '',
+        },
+    )
+    recalcular_totais(execucao_id)
+    return registro
+
+
+def recalcular_totais(execucao_id):
+    """Refaz os contadores da execução a partir das ImportRunFonte (soma única mesmo com novas tentativas)."""
+    totais = ImportRunFonte.objects.filter(execucao_id=execucao_id).aggregate(
+        fontes_processadas=Count('id'),
+        criadas=Coalesce(Sum('criadas'), 0),
+        ignoradas=Coalesce(Sum('ignoradas'), 0),
+        erros=Count('id', filter=~Q(erro='')),
+    )
+    ImportRun.objects.filter(pk=execucao_id).update(**totais)
+    return totais
+
+
+def registrar_raspagem(execucao_fonte_id, tentativas, sucessos, tempo):
+    """Soma à fonte da execução a raspagem feita depois, em raspar_conteudo_task."""
+    ImportRunFonte.objects.filter(pk=execucao_fonte_id).update(
+        raspagens=F('raspagens') + tentativas,
+        raspagens_sucesso=F('raspagens_sucesso') + sucessos,
+        tempo_raspagem=F('tempo_raspagem') + tempo,
+    )
+
+
+def finalizar_execucao(execucao, erro=''):
+    execucao.status = ImportRun.FALHOU if erro else ImportRun.CONCLUIDA
+    execucao.erro = erro
+    execucao.finalizado_em = timezone.now()
+    execucao.save(update_fields=['status', 'erro', 'finalizado_em'])
+
+
+def encerrar_execucoes_travadas():
+    """
+    Marca como falha as execuções em andamento há mais de NOTICIAS_IMPORTACAO_PRAZO.
+
+    Rede de segurança para quando nem o callback do chord nem o de erro
+    rodam (worker perdido, resultado do chord expirado no backend).
+    """
+    limite = timezone.now() - timedelta(seconds=settings.NOTICIAS_IMPORTACAO_PRAZO)
+    travadas = list(ImportRun.objects.filter(status__in=ImportRun.EM_ANDAMENTO, criado_em__lt=limite))
+    for execucao in travadas:
+        recalcular_totais(execucao.pk)
+        finalizar_execucao(execucao, erro=f'Execução sem resposta há mais de {settings.NOTICIAS_IMPORTACAO_PRAZO}s')
+    return len(travadas)
+
+
+def podar_execucoes(dias=None):
+    """
+    Apaga as execuções (e a telemetria por fonte) com mais de `dias` dias.
+
+    A telemetria vai primeiro, em um DELETE só; depois as ImportRun já sem
+    filhos. Retorna quantas execuções saíram.
+    """
+    dias = settings.NOTICIAS_EXECUCOES_RETENCAO_DIAS if dias is None else dias
+    limite = timezone.now() - timedelta(days=dias)
+    ImportRunFonte.objects.filter(execucao__criado_em__lt=limite).delete()
+    _, por_modelo = ImportRun.objects.filter(criado_em__lt=limite).delete()
+    return por_modelo.get(ImportRun._meta.label, 0)
+
+
+def tempo_total():
+    """Expressão do tempo de worker gasto em uma ImportRunFonte (download + parse + gravação + raspagem)."""
+    return Coalesce('latencia', Value(0.0)) + F('tempo_parse') + F('tempo_persistencia') + F('tempo_raspagem')
+
+
+def estatisticas_execucoes(desde):
+    return ImportRun.objects.filter(criado_em__gte=desde).aggregate(
+        total=Count('id'),
+        concluidas=Count('id', filter=Q(status=ImportRun.CONCLUIDA)),
+        falhas=Count('id', filter=Q(status=ImportRun.FALHOU)),
+        noticias_criadas=Coalesce(Sum('criadas'), 0),
+        duracao_media=Avg(F('finalizado_em') - F('iniciado_em')),
+    )
+
+
+def estatisticas_por_fonte(desde):
+    """Agregado por fonte desde `desde`, das que mais consomem tempo de worker para as que menos."""
+    return (
+        ImportRunFonte.objects.filter(criado_em__gte=desde)
+        .values('fonte_id', 'nome_fonte')
+        .annotate(
+            coletas=Count('id'),
+            com_erro=Count('id', filter=~Q(erro='')),
+            nao_modificadas=Count('id', filter=Q(nao_modificado=True)),
+            total_bytes=Sum('bytes'),
+            latencia_media=Avg('latencia'),
+            latencia_maxima=Max('latencia'),
+            tempo_parse_total=Sum('tempo_parse'),
+            tempo_persistencia_total=Sum('tempo_persistencia'),
+            entradas_vistas_total=Sum('entradas_vistas'),
+            criadas_total=Sum('criadas'),
+            ignoradas_total=Sum('ignoradas'),
+            puladas_total=Sum('puladas'),
+            raspagens_total=Sum('raspagens'),
+            raspagens_sucesso_total=Sum('raspagens_sucesso'),
+            tempo_raspagem_total=Sum('tempo_raspagem'),
+            tempo_worker_total=Sum(tempo_total()),
+        )
+        .order_by('-tempo_worker_total')
+    )
@@ -0,0 +1,131 @@
+import hashlib
+import logging
+import time
+
+import requests
+from django.conf import settings
+
+from . import circuito
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = 'Mozilla/5.0 (compatible; MultiBPO-Noticias/1.0; +https://multibpo.com.br)'
+
+# Tamanho máximo aceito para um feed (evita downloads gigantes travando o worker)
+TAMANHO_MAXIMO_FEED = 5 * 1024 * 1024
+
+
+def baixar_feed(url, timeout=None, etag='', ultima_modificacao='', hash_anterior=''):
+    """
+    Baixa o conteúdo bruto de um feed respeitando um tempo total máximo.
+
+    O timeout do requests vale por leitura de socket, então um servidor que
+    envia bytes aos poucos nunca estoura. Aqui o tempo total também é limitado.
+
+    Quando os validadores da última resposta são informados, a requisição é
+    condicional (If-None-Match / If-Modified-Since). Um 304, ou um corpo com o
+    mesmo sha256 da última vez, volta com `nao_modificado=True` e sem conteúdo.
+
+    Retorna um dict com conteudo (bytes), headers relevantes para o feedparser,
+    validadores (etag, ultima_modificacao, hash), latencia (s) e erro (str ou None).
+    """
+    timeout = timeout or settings.NOTICIAS_FETCH_TIMEOUT
+    headers = {'User-Agent': USER_AGENT}
+    if etag:
+        headers['If-None-Match'] = etag
+    if ultima_modificacao:
+        headers['If-Modified-Since'] = ultima_modificacao
+
+    inicio = time.monotonic()
+    try:
+        with requests.get(url, headers=headers, timeout=timeout, stream=True) as response:
+            if response.status_code == 304:
+                return {
+                    'conteudo': None,
+                    'headers': {},
+                    'nao_modificado': True,
+                    'etag': response.headers.get('ETag', etag),
+                    'ultima_modificacao': response.headers.get('Last-Modified', ultima_modificacao),
+                    'hash': hash_anterior,
+                    'bytes': 0,
+                    'latencia': time.monotonic() - inicio,
+                    'erro': None,
+                }
+
+            response.raise_for_status()
+            partes = []
+            tamanho = 0
+            for parte in response.iter_content(chunk_size=64 * 1024):
+                partes.append(parte)
+                tamanho += len(parte)
+                if time.monotonic() - inicio > timeout:
+                    raise TimeoutError(f'tempo total excedido ({timeout}s)')
+                if tamanho > TAMANHO_MAXIMO_FEED:
+                    raise ValueError(f'feed maior que {TAMANHO_MAXIMO_FEED} bytes')
+
+            conteudo = b''.join(partes)
+            hash_conteudo = hashlib.sha256(conteudo).hexdigest()
+            nao_modificado = bool(hash_anterior) and hash_conteudo == hash_anterior
+            return {
+                'conteudo': None if nao_modificado else conteudo,
+                'headers': {
+                    'content-type': response.headers.get('Content-Type', ''),
+                    'content-location': response.url,
+                },
+                'nao_modificado': nao_modificado,
+                'etag': response.headers.get('ETag', ''),
+                'ultima_modificacao': response.headers.get('Last-Modified', ''),
+                'hash': hash_conteudo,
+                'bytes': tamanho,
+                'latencia': time.monotonic() - inicio,
+                'erro': None,
+            }
+    except Exception as e:
+        return resultado_com_erro(str(e) or e.__class__.__name__, time.monotonic() - inicio)
+
+
+def baixar_feed_da_fonte(fonte, timeout=None):
+    """Baixa o feed de uma fonte usando os validadores HTTP salvos nela."""
+    return baixar_feed(
+        fonte.feed_url,
+        timeout=timeout_da_fonte(fonte, timeout),
+        etag=fonte.etag,
+        ultima_modificacao=fonte.ultima_modificacao,
+        hash_anterior=fonte.hash_conteudo,
+    )
+
+
+def salvar_validadores(fonte, resultado):
+    """
+    Guarda na fonte os validadores da resposta, para o próximo GET condicional.
+
+    Deve ser chamado só depois que o conteúdo foi processado com sucesso,
+    senão uma falha na persistência faria a próxima rodada pular o feed.
+    """
+    if resultado['erro']:
+        return
+    fonte.etag = resultado['etag'][:255]
+    fonte.ultima_modificacao = resultado['ultima_modificacao'][:64]
+    fonte.hash_conteudo = resultado['hash']
+    fonte.save(update_fields=['etag', 'ultima_modificacao', 'hash_conteudo'])
+
+
+def timeout_da_fonte(fonte, timeout=None):
+    # Sonda de circuito aberto: uma tentativa curta em vez de esperar o timeout inteiro
+    if circuito.estado(fonte.falhas_consecutivas, fonte.circuito_aberto_ate) == circuito.SONDA:
+        return settings.NOTICIAS_CIRCUITO_TIMEOUT_SONDA
+    return timeout
+
+
+def resultado_com_erro(erro, latencia):
+    return {
+        'conteudo': None,
+        'headers': {},
+        'nao_modificado': False,
+        'etag': '',
+        'ultima_modificacao': '',
+        'hash': '',
+        'bytes': 0,
+        'latencia': latencia,
+        'erro': erro,
+    }
@@ -0,0 +1,137 @@
+import hashlib
+import io
+import json
+import logging
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+from .cache import invalidar_cache_api
+from .models import Noticia
+from .scraping import obter_sessao
+
+logger = logging.getLogger(__name__)
+
+DIRETORIO_IMAGENS = 'noticias/imagens'
+FORMATOS = {
+    'webp': {'format': 'WEBP', 'quality': 80, 'method': 4},
+    'jpeg': {'format': 'JPEG', 'quality': 82, 'optimize': True, 'progressive': True},
+}
+EXTENSOES = {'webp': 'webp', 'jpeg': 'jpg'}
+
+
+def _diretorio(url):
+    # Mesmo endereço de imagem sempre cai no mesmo diretório: baixa uma vez só
+    digest = hashlib.sha1(url.encode()).hexdigest()
+    return f'{DIRETORIO_IMAGENS}/{digest[:2]}/{digest}'
+
+
+def baixar_imagem(url, timeout=15):
+    """Baixa a imagem original com limite de tamanho. Retorna os bytes."""
+    limite = settings.NOTICIAS_IMAGEM_TAMANHO_MAXIMO
+    with obter_sessao().get(url, timeout=timeout, stream=True) as response:
+        response.raise_for_status()
+        partes = []
+        tamanho = 0
+        for parte in response.iter_content(chunk_size=64 * 1024):
+            partes.append(parte)
+            tamanho += len(parte)
+            if tamanho > limite:
+                raise ValueError(f'imagem maior que {limite} bytes')
+    return b''.join(partes)
+
+
+def gerar_variantes(conteudo, diretorio):
+    """
+    Gera as versões redimensionadas (WebP e JPEG) de uma imagem.
+
+    Nunca amplia: larguras maiores que a original são ignoradas, mas a menor
+    largura configurada sempre é gerada. Retorna (largura, altura, variantes),
+    com variantes no formato {"320": {"webp": caminho, "jpeg": caminho}}.
+    """
+    with Image.open(io.BytesIO(conteudo)) as original:
+        original = ImageOps.exif_transpose(original)
+        largura, altura = original.size
+        rgb = original.convert('RGB')
+
+    larguras = sorted(settings.NOTICIAS_MINIATURAS_LARGURAS)
+    variantes = {}
+    for indice, largura_alvo in enumerate(larguras):
+        if largura_alvo > largura and indice > 0:
+            break
+        copia = rgb.copy()
+        copia.thumbnail((largura_alvo, largura_alvo * 4), Image.LANCZOS)
+        variantes[str(largura_alvo)] = {}
+        for formato, opcoes in FORMATOS.items():
+            buffer = io.BytesIO()
+            copia.save(buffer, **opcoes)
+            caminho = f'{diretorio}/{largura_alvo}.{EXTENSOES[formato]}'
+            if default_storage.exists(caminho):
+                default_storage.delete(caminho)
+            variantes[str(largura_alvo)][formato] = default_storage.save(caminho, ContentFile(buffer.getvalue()))
+    return largura, altura, variantes
+
+
+def processar_imagem(noticia):
+    """
+    Baixa a imagem da notícia e grava as miniaturas em MEDIA_ROOT.
+
+    Se a mesma URL já foi processada (por outra notícia ou fonte), reaproveita
+    o meta.json gravado junto das variantes, sem baixar de novo. Retorna True
+    se a notícia ficou com miniaturas.
+    """
+    diretorio = _diretorio(noticia.imagem)
+    metadados = f'{diretorio}/meta.json'
+    if default_storage.exists(metadados):
+        with default_storage.open(metadados) as arquivo:
+            dados = json.load(arquivo)
+        noticia.imagem_largura = dados['largura']
+        noticia.imagem_altura = dados['altura']
+        noticia.imagem_bytes = dados['bytes']
+        noticia.imagem_variantes = dados['variantes']
+        return True
+
+    try:
+        conteudo = baixar_imagem(noticia.imagem)
+        largura, altura, variantes = gerar_variantes(conteudo, diretorio)
+    except Exception as e:
+        logger.warning(f'Erro ao gerar miniaturas de {noticia.imagem}: {e}')
+        return False
+
+    dados = {'largura': largura, 'altura': altura, 'bytes': len(conteudo), 'variantes': variantes}
+    default_storage.save(metadados, ContentFile(json.dumps(dados).encode()))
+
+    noticia.imagem_largura = largura
+    noticia.imagem_altura = altura
+    noticia.imagem_bytes = len(conteudo)
+    noticia.imagem_variantes = variantes
+    return True
+
+
+def gerar_miniaturas(noticia_ids):
+    """Gera as miniaturas das notícias que têm imagem e ainda não foram processadas."""
+    noticias = list(
+        Noticia.objects.filter(id__in=noticia_ids, imagem__isnull=False, imagem_variantes={})
+        .exclude(imagem='')
+        .only('id', 'imagem', 'imagem_largura', 'imagem_altura', 'imagem_bytes', 'imagem_variantes')
+    )
+    processadas = [noticia for noticia in noticias if processar_imagem(noticia)]
+    if processadas:
+        Noticia.objects.bulk_update(
+            processadas, ['imagem_largura', 'imagem_altura', 'imagem_bytes', 'imagem_variantes']
+        )
+        invalidar_cache_api()
+    return {'tentativas': len(noticias), 'processadas': len(processadas)}
+
+
+def urls_miniaturas(noticia, request=None):
+    """URLs públicas das miniaturas, absolutas quando houver request."""
+    urls = {}
+    for largura, formatos in (noticia.imagem_variantes or {}).items():
+        urls[largura] = {}
+        for formato, caminho in formatos.items():
+            url = default_storage.url(caminho)
+            urls[largura][formato] = request.build_absolute_uri(url) if request else url
+    return urls
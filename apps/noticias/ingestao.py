@@ -0,0 +1,153 @@
+import logging
+from datetime import datetime
+
+from django.db import transaction
+from django.utils.timezone import make_aware
+
+from .busca import atualizar_busca
+from .cache import invalidar_cache_api
+from .canonicalizacao import hash_url
+from .categorias import registrar_noticias
+from .models import Fonte, Noticia, NoticiaArquivada
+
+logger = logging.getLogger(__name__)
+
+TAMANHO_LOTE = 500
+
+
+def persistir_noticias(fonte, noticias):
+    """
+    Grava em lote as notícias de uma fonte, ignorando as que já existem.
+
+    Em vez de um get_or_create por item, faz uma única consulta pelos pares
+    (fonte, link_hash) já gravados, filtra em memória e insere o restante com
+    bulk_create, tudo em uma transação por fonte. A transação começa travando
+    a linha da Fonte: outra importação da mesma fonte espera a primeira
+    terminar e já enxerga o que ela gravou, então as contagens e os ids
+    devolvidos são só das notícias inseridas por esta chamada.
+
+    A comparação é pelo hash da URL canônica (ver canonicalizacao.py): o
+    mesmo artigo com utm_*, fragmento ou http/https diferente não entra de
+    novo. O link em si é gravado como veio do feed. A restrição única em
+    (fonte, link_hash) garante isso no banco mesmo fora deste caminho.
+
+    Retorna um dict com as contagens `criadas`/`ignoradas` e os `ids` criados.
+    """
+    # Links repetidos dentro do mesmo feed (inclusive variações do mesmo link) contam como ignorados
+    por_hash = {}
+    for noticia in noticias:
+        if not limitar_campos(fonte, noticia):
+            continue
+        noticia.link_hash = hash_url(noticia.link)
+        por_hash.setdefault(noticia.link_hash, noticia)
+
+    ids = []
+    if por_hash:
+        with transaction.atomic():
+            Fonte.objects.select_for_update().filter(pk=fonte.pk).first()
+            existentes = set(
+                Noticia.objects.filter(fonte=fonte, link_hash__in=list(por_hash))
+                .values_list('link_hash', flat=True)
+            )
+            # Notícias que a retenção já arquivou não voltam para a tabela principal
+            existentes.update(
+                NoticiaArquivada.objects.filter(fonte=fonte, link_hash__in=list(por_hash))
+                .values_list('link_hash', flat=True)
+            )
+            novas = [noticia for link_hash, noticia in por_hash.items() if link_hash not in existentes]
+            if novas:
+                # Sem ignore_conflicts o Postgres devolve os ids (RETURNING) de cada linha inserida
+                Noticia.objects.bulk_create(novas, batch_size=TAMANHO_LOTE)
+                ids = [noticia.pk for noticia in novas]
+                # bulk_create não passa pelo save(): preenche o índice de busca aqui
+                atualizar_busca(Noticia.objects, novas)
+                registrar_noticias(ids)
+
+    if ids:
+        # Dentro da transação de importar_fonte, só depois do COMMIT
+        transaction.on_commit(invalidar_cache_api)
+
+    return {
+        'criadas': len(ids),
+        'ignoradas': len(noticias) - len(ids),
+        'ids': ids,
+    }
+
+
+def limitar_campos(fonte, noticia):
+    """
+    Ajusta a notícia aos tamanhos das colunas antes do bulk_create.
+
+    Um valor grande demais derrubaria o lote inteiro da fonte (DataError) e,
+    como a mesma entrada volta a cada coleta, abriria o circuito de vez. O
+    título é cortado e uma imagem longa demais é descartada. Devolve False
+    se o link não cabe: sem ele a notícia é ignorada.
+    """
+    max_link = Noticia._meta.get_field('link').max_length
+    if not noticia.link or len(noticia.link) > max_link:
+        logger.warning(f'Link inválido ignorado na fonte "{fonte.nome}": {noticia.link!r}')
+        return False
+    noticia.titulo = (noticia.titulo or '')[:Noticia._meta.get_field('titulo').max_length]
+    if noticia.imagem and len(noticia.imagem) > Noticia._meta.get_field('imagem').max_length:
+        logger.warning(f'Imagem longa demais descartada na fonte "{fonte.nome}": {noticia.imagem[:100]!r}...')
+        noticia.imagem = None
+    return True
+
+
+def hash_link(link):
+    # Marca d'água da fonte: o mesmo hash canônico usado na deduplicação
+    return str(hash_url(link))
+
+
+def data_publicacao(entry):
+    """Data de publicação da entrada do feed, ou None se o feed não informar."""
+    if getattr(entry, 'published_parsed', None):
+        return make_aware(datetime(*entry.published_parsed[:6]))
+    return None
+
+
+def feed_em_ordem_cronologica(entries):
+    """
+    Indica se dá para confiar na ordem do feed: todas as entradas têm data e
+    vêm da mais nova para a mais antiga.
+    """
+    datas = [data_publicacao(entry) for entry in entries]
+    if not datas or None in datas:
+        return False
+    return all(anterior >= posterior for anterior, posterior in zip(datas, datas[1:]))
+
+
+def filtrar_entradas_novas(fonte, entries):
+    """
+    Corta o feed na marca d'água da fonte (entrada mais recente já gravada).
+
+    Em feeds ordenados, a leitura para na primeira entrada já conhecida: o
+    mesmo link da marca, ou uma data anterior a ela. Entradas com a mesma
+    data da marca continuam, porque várias notícias podem sair no mesmo
+    segundo; a deduplicação em persistir_noticias cuida delas. Se a ordem do
+    feed não for confiável, devolve todas as entradas (varredura completa).
+    """
+    entries = list(entries)
+    if not fonte.ultima_publicacao_em or not feed_em_ordem_cronologica(entries):
+        return entries
+
+    novas = []
+    for entry in entries:
+        if hash_link(entry.link) == fonte.ultimo_link_hash:
+            break
+        if data_publicacao(entry) < fonte.ultima_publicacao_em:
+            break
+        novas.append(entry)
+    return novas
+
+
+def atualizar_marca_dagua(fonte, noticias):
+    """Avança a marca d'água da fonte para a notícia mais recente processada."""
+    if not noticias:
+        return
+    mais_recente = max(noticias, key=lambda noticia: noticia.publicado_em)
+    if fonte.ultima_publicacao_em and mais_recente.publicado_em <= fonte.ultima_publicacao_em:
+        return
+    fonte.ultima_publicacao_em = mais_recente.publicado_em
+    fonte.ultimo_link_hash = hash_link(mais_recente.link)
+    fonte.save(update_fields=['ultima_publicacao_em', 'ultimo_link_hash'])
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from apps.noticias.arquivamento import arquivar_noticias, limite_retencao
+
+
+class Command(BaseCommand):
+    help = 'Move para o arquivo compactado as notícias mais antigas que a retenção configurada'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--meses',
+            type=int,
+            default=None,
+            help='Meses completos mantidos na tabela principal (padrão: NOTICIAS_RETENCAO_MESES)',
+        )
+
+    def handle(self, *args, **options):
+        limite = limite_retencao(options['meses'])
+        self.stdout.write(f'Arquivando notícias publicadas antes de {limite:%d/%m/%Y}')
+        resultado = arquivar_noticias(options['meses'])
+        for mes, total in resultado['meses'].items():
+            self.stdout.write(f'  {mes}: {total}')
+        self.stdout.write(self.style.SUCCESS(f'{resultado["arquivadas"]} notícias arquivadas'))
@@ -0,0 +1,88 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from apps.noticias import campos
+from apps.noticias.models import Noticia
+
+
+class Command(BaseCommand):
+    help = (
+        'Mede, sobre as notícias gravadas, a economia de espaço e o custo de '
+        'compactar/descompactar resumo e conteudo_completo (texto puro, zlib e zstd)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--amostra', type=int, default=2000, help='Notícias mais recentes usadas no teste')
+        parser.add_argument('--repeticoes', type=int, default=3, help='Rodadas de cada medição (vale a melhor)')
+
+    def handle(self, *args, **options):
+        ids = list(Noticia.objects.order_by('-id').values_list('id', flat=True)[:options['amostra']])
+        if not ids:
+            raise CommandError('Nenhuma notícia gravada para servir de corpus')
+        textos = [
+            texto
+            for resumo, conteudo in Noticia.objects.filter(id__in=ids).values_list('resumo', 'conteudo_completo')
+            for texto in (resumo, conteudo)
+            if texto
+        ]
+        original = sum(len(texto.encode()) for texto in textos)
+        self.stdout.write(f'Corpus: {len(ids)} notícias, {len(textos)} textos, {original / 1024 / 1024:.2f} MB em UTF-8')
+
+        formatos = [('zlib', campos.FORMATO_ZLIB)]
+        if campos.zstandard:
+            formatos.append(('zstd', campos.FORMATO_ZSTD))
+        else:
+            self.stdout.write(self.style.WARNING('zstandard não instalado: só zlib será medido'))
+
+        for nome, formato in formatos:
+            compactados, escrita = self.medir(options['repeticoes'], lambda: [campos.compactar_texto(texto, formato) for texto in textos])
+            _, leitura = self.medir(options['repeticoes'], lambda: [campos.descompactar_texto(valor) for valor in compactados])
+            tamanho = sum(len(valor) for valor in compactados)
+            megabytes = original / 1024 / 1024
+            self.stdout.write(
+                f'{nome}: {tamanho / 1024 / 1024:.2f} MB ({tamanho / original:.0%} do original); '
+                f'escrita {escrita / megabytes * 1000:.1f} ms/MB, leitura {leitura / megabytes * 1000:.1f} ms/MB'
+            )
+
+        self.medir_banco(ids, options['repeticoes'])
+
+    def medir(self, repeticoes, funcao):
+        melhor, resultado = None, None
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            resultado = funcao()
+            duracao = time.perf_counter() - inicio
+            melhor = duracao if melhor is None else min(melhor, duracao)
+        return resultado, melhor
+
+    def medir_banco(self, ids, repeticoes):
+        """Espaço ocupado de fato e leitura pelo ORM (com descompactação) vs bytes crus."""
+        tabela = Noticia._meta.db_table
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT sum(pg_column_size(resumo)), sum(pg_column_size(conteudo_completo)), '
+                f'pg_total_relation_size(%s) FROM {tabela}',
+                [tabela],
+            )
+            resumo, conteudo, total = cursor.fetchone()
+        self.stdout.write(
+            f'No banco: resumo {(resumo or 0) / 1024 / 1024:.2f} MB, conteudo_completo '
+            f'{(conteudo or 0) / 1024 / 1024:.2f} MB, tabela com índices e TOAST {total / 1024 / 1024:.2f} MB'
+        )
+
+        def crus():
+            with connection.cursor() as cursor:
+                cursor.execute(f'SELECT resumo, conteudo_completo FROM {tabela} WHERE id = ANY(%s)', [ids])
+                return cursor.fetchall()
+
+        def orm():
+            return list(Noticia.objects.filter(id__in=ids).values_list('resumo', 'conteudo_completo'))
+
+        _, tempo_crus = self.medir(repeticoes, crus)
+        _, tempo_orm = self.medir(repeticoes, orm)
+        self.stdout.write(
+            f'Leitura de {len(ids)} notícias: {tempo_crus * 1000:.1f} ms em bytes crus, '
+            f'{tempo_orm * 1000:.1f} ms pelo ORM descompactando (+{(tempo_orm - tempo_crus) * 1000:.1f} ms)'
+        )
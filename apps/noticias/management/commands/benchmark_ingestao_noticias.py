@@ -0,0 +1,202 @@
+import json
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+import feedparser
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Sum
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+
+from apps.noticias import scraping
+from apps.noticias.benchmark import FORMATOS, Corpus, ServidorLocal
+from apps.noticias.models import Fonte, ImportRunFonte, Noticia
+from apps.noticias.tasks import extrair_imagem_feed, importar_noticias_task
+
+CACHE_LOCAL = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'noticias-benchmark'}}
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark offline da ingestão: sobe um servidor local com feeds e artigos '
+        'gerados, roda importar_noticias_task de ponta a ponta (dados desfeitos no '
+        'final) e microbenchmarks de extração. Gera um relatório JSON comparável entre commits.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fontes', type=int, default=10)
+        parser.add_argument('--entradas', type=int, default=50, help='Itens por feed')
+        parser.add_argument('--tamanho-artigo', type=int, default=5000, help='Caracteres de texto por artigo')
+        parser.add_argument('--fracao-raspagem', type=float, default=0.5, help='Fração dos itens só com resumo (vão para o scraping)')
+        parser.add_argument('--formato', choices=FORMATOS, default='misto')
+        parser.add_argument('--latencia-ms', type=float, default=0, help='Atraso do servidor local por requisição')
+        parser.add_argument('--repeticoes', type=int, default=5, help='Rodadas dos microbenchmarks (vale a melhor)')
+        parser.add_argument('--sem-ponta-a-ponta', action='store_true')
+        parser.add_argument('--sem-micro', action='store_true')
+        parser.add_argument('--saida', help='Grava o relatório JSON neste arquivo')
+        parser.add_argument('--comparar', help='Relatório JSON anterior para comparar')
+
+    def handle(self, *args, **options):
+        corpus = Corpus(
+            fontes=options['fontes'],
+            entradas=options['entradas'],
+            tamanho_artigo=options['tamanho_artigo'],
+            fracao_raspagem=options['fracao_raspagem'],
+            formato=options['formato'],
+        )
+        relatorio = {
+            'commit': self.commit_atual(),
+            'gerado_em': timezone.now().isoformat(),
+            'parametros': {
+                chave: options[chave]
+                for chave in ('fontes', 'entradas', 'tamanho_artigo', 'fracao_raspagem', 'formato', 'latencia_ms', 'repeticoes')
+            },
+        }
+
+        # O limitador de cortesia é para sites reais: no servidor local todos os artigos têm o mesmo host
+        with ServidorLocal(corpus, options['latencia_ms'] / 1000) as servidor, override_settings(
+            CACHES=CACHE_LOCAL,
+            NOTICIAS_SCRAPING_INTERVALO_DOMINIO=0,
+            NOTICIAS_SCRAPING_MAX_POR_DOMINIO=settings.NOTICIAS_SCRAPING_WORKERS,
+        ), self.scraping_temporario():
+            if not options['sem_ponta_a_ponta']:
+                relatorio['ponta_a_ponta'] = self.ponta_a_ponta(corpus, servidor)
+            if not options['sem_micro']:
+                relatorio['micro'] = self.micro(corpus, servidor, options['repeticoes'])
+
+        self.stdout.write(json.dumps(relatorio, indent=2, ensure_ascii=False))
+        if options['saida']:
+            with open(options['saida'], 'w') as arquivo:
+                json.dump(relatorio, arquivo, indent=2, ensure_ascii=False)
+            self.stdout.write(self.style.SUCCESS(f'Relatório gravado em {options["saida"]}'))
+        if options['comparar']:
+            with open(options['comparar']) as arquivo:
+                self.comparar(json.load(arquivo), relatorio)
+
+    def commit_atual(self):
+        try:
+            saida = subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+            )
+            return saida.stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return ''
+
+    @contextmanager
+    def scraping_temporario(self):
+        """
+        Força um limitador novo (com os settings do benchmark) e devolve ao
+        módulo de scraping o limitador e os perfis que ele tinha antes.
+        """
+        limitador, perfis = scraping._limitador, dict(scraping._perfis)
+        scraping._limitador = None
+        try:
+            yield
+        finally:
+            scraping._limitador = limitador
+            scraping._perfis.clear()
+            scraping._perfis.update(perfis)
+
+    @contextmanager
+    def celery_sincrono(self):
+        """Roda as subtarefas (.delay) no mesmo processo, para medir o pipeline inteiro."""
+        conf = importar_noticias_task.app.conf
+        anteriores = conf.task_always_eager, conf.task_eager_propagates
+        conf.task_always_eager = conf.task_eager_propagates = True
+        try:
+            yield
+        finally:
+            conf.task_always_eager, conf.task_eager_propagates = anteriores
+
+    def ponta_a_ponta(self, corpus, servidor):
+        """importar_noticias_task com scraping, miniaturas e aquecimento do cache, dentro de um rollback."""
+        resultado = {}
+        with tempfile.TemporaryDirectory() as media, override_settings(MEDIA_ROOT=media), self.celery_sincrono():
+            try:
+                with transaction.atomic():
+                    fontes = Fonte.objects.bulk_create([
+                        Fonte(nome=f'Benchmark {i}', feed_url=servidor.url_feed(i), categoria_padrao='Benchmark')
+                        for i in range(corpus.fontes)
+                    ])
+
+                    tracemalloc.start()
+                    try:
+                        with CaptureQueriesContext(connection) as consultas:
+                            inicio = time.perf_counter()
+                            retorno = importar_noticias_task(fonte_ids=[fonte.pk for fonte in fontes])
+                            duracao = time.perf_counter() - inicio
+                        pico = tracemalloc.get_traced_memory()[1]
+                    finally:
+                        tracemalloc.stop()
+
+                    criadas = Noticia.objects.filter(fonte__in=fontes).count()
+                    etapas = ImportRunFonte.objects.filter(execucao_id=retorno['import_run_id']).aggregate(
+                        download=Sum('latencia'), parse=Sum('tempo_parse'),
+                        persistencia=Sum('tempo_persistencia'), raspagem=Sum('tempo_raspagem'),
+                    )
+                    resultado = {
+                        'entradas': corpus.fontes * corpus.entradas,
+                        'criadas': criadas,
+                        'duracao_s': round(duracao, 3),
+                        'entradas_por_segundo': round(criadas / duracao, 2) if duracao else None,
+                        'consultas': len(consultas),
+                        'consultas_por_entrada': round(len(consultas) / criadas, 2) if criadas else None,
+                        'pico_memoria_mb': round(pico / 1024 / 1024, 2),
+                        'requisicoes_http': dict(servidor.requisicoes),
+                        'etapas_s': {nome: round(valor or 0, 3) for nome, valor in etapas.items()},
+                    }
+                    raise Rollback
+            except Rollback:
+                pass
+        return resultado
+
+    def micro(self, corpus, servidor, repeticoes):
+        entradas = []
+        for fonte in range(corpus.fontes):
+            conteudo, _ = corpus.feed(fonte, servidor.base_url)
+            entradas.extend(feedparser.parse(conteudo).entries)
+
+        artigos = [(fonte, indice) for fonte in range(corpus.fontes) for indice in range(corpus.entradas)][:100]
+        urls = [servidor.url_artigo(fonte, indice) for fonte, indice in artigos]
+        paginas = [corpus.artigo(fonte, indice) for fonte, indice in artigos]
+
+        imagem = self.melhor_tempo(repeticoes, lambda: [extrair_imagem_feed(entrada) for entrada in entradas])
+        download = self.melhor_tempo(repeticoes, lambda: [scraping.extrair_conteudo_completo_web(url) for url in urls])
+        extracao = self.melhor_tempo(repeticoes, lambda: [scraping.extrair_do_html(pagina) for pagina in paginas])
+        return {
+            'extrair_imagem_feed_us': round(imagem / len(entradas) * 1e6, 2),
+            'extrair_conteudo_completo_web_ms': round(download / len(urls) * 1000, 3),
+            'extrair_do_html_ms': round(extracao / len(paginas) * 1000, 3),
+        }
+
+    def melhor_tempo(self, repeticoes, funcao):
+        melhor = None
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            funcao()
+            duracao = time.perf_counter() - inicio
+            melhor = duracao if melhor is None else min(melhor, duracao)
+        return melhor
+
+    def comparar(self, anterior, atual):
+        if anterior.get('parametros') != atual['parametros']:
+            self.stdout.write(self.style.WARNING('Os relatórios foram gerados com parâmetros diferentes'))
+        self.stdout.write(f'Comparação {anterior.get("commit") or "?"} -> {atual["commit"] or "?"}')
+        for secao in ('ponta_a_ponta', 'micro'):
+            if secao not in anterior or secao not in atual:
+                continue
+            for nome, valor in atual[secao].items():
+                antes = anterior[secao].get(nome)
+                if not isinstance(valor, (int, float)) or not isinstance(antes, (int, float)):
+                    continue
+                variacao = f'{(valor - antes) / antes:+.1%}' if antes else 'n/a'
+                self.stdout.write(f'  {secao}.{nome}: {antes} -> {valor} ({variacao})')
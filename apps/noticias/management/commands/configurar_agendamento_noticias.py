@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand
+from django_celery_beat.models import CrontabSchedule, IntervalSchedule, PeriodicTask
+
+TAREFA_DESPACHO = 'apps.noticias.tasks.despachar_coletas_task'
+TAREFA_IMPORTACAO = 'apps.noticias.tasks.importar_noticias_task'
+TAREFA_ARQUIVAMENTO = 'apps.noticias.tasks.arquivar_noticias_task'
+
+
+class Command(BaseCommand):
+    help = 'Cria (ou atualiza) no django_celery_beat o tick do agendamento adaptativo de notícias'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--minutos',
+            type=int,
+            default=1,
+            help='Frequência do tick que verifica as fontes com coleta vencida (padrão: 1)',
+        )
+
+    def handle(self, *args, **options):
+        intervalo, _ = IntervalSchedule.objects.get_or_create(
+            every=options['minutos'],
+            period=IntervalSchedule.MINUTES,
+        )
+        tarefa, criada = PeriodicTask.objects.update_or_create(
+            name='Notícias: despachar coletas devidas',
+            defaults={
+                'task': TAREFA_DESPACHO,
+                'interval': intervalo,
+                'enabled': True,
+            },
+        )
+
+        # Retenção: uma vez por dia, de madrugada
+        diario, _ = CrontabSchedule.objects.get_or_create(
+            minute='30', hour='3', day_of_week='*', day_of_month='*', month_of_year='*',
+        )
+        PeriodicTask.objects.update_or_create(
+            name='Notícias: arquivar notícias antigas',
+            defaults={'task': TAREFA_ARQUIVAMENTO, 'crontab': diario, 'interval': None, 'enabled': True},
+        )
+
+        # O ciclo fixo de 30 minutos para todas as fontes deixa de ser usado
+        desativadas = PeriodicTask.objects.filter(task=TAREFA_IMPORTACAO, enabled=True).update(enabled=False)
+
+        acao = 'criada' if criada else 'atualizada'
+        self.stdout.write(self.style.SUCCESS(
+            f'Tarefa "{tarefa.name}" {acao} (a cada {options["minutos"]} min); '
+            f'{desativadas} agendamento(s) fixo(s) desativado(s); arquivamento diário às 03:30'
+        ))
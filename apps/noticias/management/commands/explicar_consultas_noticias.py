@@ -0,0 +1,139 @@
+import random
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from apps.noticias.cache import agregado_etag
+from apps.noticias.canonicalizacao import hash_url
+from apps.noticias.models import Fonte, Noticia
+from apps.noticias.paginacao import KeysetPagination
+
+CATEGORIAS_TESTE = ['Economia', 'Tributário', 'Contabilidade', 'Tecnologia', 'Negócios']
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Roda EXPLAIN ANALYZE nas consultas canônicas de notícias (API, admin e '
+        'deduplicação) e indica quais usam índice e quais fazem Seq Scan'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--popular',
+            type=int,
+            default=0,
+            help='Cria N notícias fictícias antes (dentro de uma transação desfeita no final)',
+        )
+        parser.add_argument('--fontes', type=int, default=50, help='Fontes fictícias usadas com --popular')
+        parser.add_argument('--completo', action='store_true', help='Mostra o plano inteiro de cada consulta')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            self.stderr.write('Este comando depende do EXPLAIN do PostgreSQL')
+            return
+
+        try:
+            with transaction.atomic():
+                if options['popular']:
+                    self.popular(options['popular'], options['fontes'])
+                self.explicar(options['completo'])
+                if options['popular']:
+                    raise Rollback
+        except Rollback:
+            self.stdout.write('Dados fictícios descartados')
+
+    def popular(self, quantidade, quantidade_fontes):
+        agora = timezone.now()
+        fontes = Fonte.objects.bulk_create([
+            Fonte(
+                nome=f'Fonte de teste {i}',
+                feed_url=f'https://explain.invalid/{i}/feed.xml',
+                categoria_padrao=CATEGORIAS_TESTE[i % len(CATEGORIAS_TESTE)],
+            )
+            for i in range(quantidade_fontes)
+        ])
+        lote = []
+        for i in range(quantidade):
+            fonte = random.choice(fontes)
+            link = f'https://explain.invalid/{fonte.pk}/noticia-{i}'
+            lote.append(Noticia(
+                fonte=fonte,
+                titulo=f'Notícia de teste {i}',
+                resumo='Resumo de teste ' * 20,
+                conteudo_completo='Parágrafo de conteúdo de teste. ' * 300,
+                categoria=fonte.categoria_padrao,
+                link=link,
+                link_hash=hash_url(link),
+                publicado_em=agora - timedelta(minutes=random.randint(0, 60 * 24 * 365)),
+            ))
+            if len(lote) == 5000:
+                Noticia.objects.bulk_create(lote)
+                lote = []
+        Noticia.objects.bulk_create(lote)
+
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE noticias_fonte')
+            cursor.execute('ANALYZE noticias_noticia')
+        self.stdout.write(f'{quantidade} notícias fictícias criadas em {quantidade_fontes} fontes')
+
+    def consultas(self):
+        """
+        As consultas que a API, o admin e a importação fazem de fato.
+
+        Cada uma é um queryset ou, para as que não devolvem queryset (o
+        aggregate da ETag), uma função que executa a consulta pelo mesmo
+        helper da view; o SQL dela é capturado e explicado.
+        """
+        exemplo = Noticia.objects.order_by('-publicado_em', '-id').first()
+        categoria = (exemplo and exemplo.categoria) or CATEGORIAS_TESTE[0]
+        fonte_id = exemplo.fonte_id if exemplo else 0
+        referencia = exemplo.publicado_em if exemplo else timezone.now()
+        pagina = 50
+        lista = Noticia.objects.order_by('-publicado_em', '-id')
+        cursor = KeysetPagination().apos_cursor(lista, referencia, exemplo.pk if exemplo else 0)
+
+        # Mesma consulta de persistir_noticias: pelo hash da URL canônica, dentro da fonte
+        links = list(Noticia.objects.filter(fonte_id=fonte_id).values_list('link', flat=True)[:50])
+        hashes = [hash_url(link) for link in links] or [0]
+
+        return [
+            ('lista (primeira página)', lista[:pagina]),
+            ('lista por categoria', lista.filter(categoria=categoria)[:pagina]),
+            ('lista por categoria da fonte', lista.filter(fonte__categoria_padrao=categoria)[:pagina]),
+            ('lista por fonte', lista.filter(fonte_id=fonte_id)[:pagina]),
+            ('lista agrupada (?agrupar)', lista.filter(duplicata_de__isnull=True)[:pagina]),
+            ('cursor (página seguinte)', cursor[:pagina]),
+            ('admin date_hierarchy (mês)', lista.filter(
+                publicado_em__year=referencia.year, publicado_em__month=referencia.month)[:100]),
+            ('deduplicação na importação', Noticia.objects.filter(fonte_id=fonte_id, link_hash__in=hashes)
+                .values_list('link_hash', flat=True)),
+            ('ETag por categoria (MAX id/criado_em)', lambda: agregado_etag(Noticia.objects.filter(categoria=categoria))),
+        ]
+
+    def explicar(self, completo):
+        for nome, consulta in self.consultas():
+            plano = self.explicar_sql(consulta) if callable(consulta) else consulta.explain(analyze=True, buffers=True)
+
+            usa_seq_scan = 'Seq Scan on noticias_noticia' in plano
+            estilo = self.style.WARNING if usa_seq_scan else self.style.SUCCESS
+            linhas = plano.splitlines()
+            tempo = next((linha.strip() for linha in reversed(linhas) if 'Execution Time' in linha), '')
+            self.stdout.write(estilo(f'{nome}: {"SEQ SCAN" if usa_seq_scan else "índice"} ({tempo})'))
+            if completo or usa_seq_scan:
+                self.stdout.write(plano)
+                self.stdout.write('')
+
+    def explicar_sql(self, executar):
+        """EXPLAIN ANALYZE da última consulta feita por `executar`."""
+        with CaptureQueriesContext(connection) as capturadas:
+            executar()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN (ANALYZE, BUFFERS) {capturadas[-1]["sql"]}')
+            return '\n'.join(linha for linha, in cursor.fetchall())
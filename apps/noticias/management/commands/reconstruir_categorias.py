@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from apps.noticias.categorias import reconstruir_indice
+from apps.noticias.models import Categoria
+
+
+class Command(BaseCommand):
+    help = 'Recalcula o índice de categorias (contagens e última publicação) a partir das tabelas'
+
+    def handle(self, *args, **options):
+        reconstruir_indice()
+        self.stdout.write(self.style.SUCCESS(f'{Categoria.objects.count()} categorias recalculadas'))
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.5 on 2026-10-17 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('noticias', '0004_alter_fonte_feed_url_alter_noticia_imagem_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='fonte',
+            name='etag',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='fonte',
+            name='ultima_modificacao',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='fonte',
+            name='hash_conteudo',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+    ]
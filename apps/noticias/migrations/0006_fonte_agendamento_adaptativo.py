@@ -0,0 +1,38 @@
+# Generated by Django 5.2.5 on 2026-10-17 11:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('noticias', '0005_fonte_validadores_http'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='fonte',
+            name='intervalo_coleta',
+            field=models.PositiveIntegerField(default=1800),
+        ),
+        migrations.AddField(
+            model_name='fonte',
+            name='intervalo_publicacao',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='fonte',
+            name='falhas_consecutivas',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='fonte',
+            name='ultima_coleta_em',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='fonte',
+            name='proxima_coleta_em',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+    ]
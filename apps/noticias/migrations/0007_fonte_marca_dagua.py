@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-17 11:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('noticias', '0006_fonte_agendamento_adaptativo'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='fonte',
+            name='ultima_publicacao_em',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='fonte',
+            name='ultimo_link_hash',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+    ]
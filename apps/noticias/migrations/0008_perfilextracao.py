@@ -0,0 +1,31 @@
+# Generated by Django 5.2.5 on 2026-10-17 12:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('noticias', '0007_fonte_marca_dagua'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PerfilExtracao',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dominio', models.CharField(max_length=255, unique=True)),
+                ('seletor', models.CharField(blank=True, default='', max_length=100)),
+                ('tentativas', models.PositiveIntegerField(default=0)),
+                ('sucessos', models.PositiveIntegerField(default=0)),
+                ('caracteres_extraidos', models.BigIntegerField(default=0)),
+                ('tempo_download', models.FloatField(default=0)),
+                ('tempo_extracao', models.FloatField(default=0)),
+                ('atualizado_em', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Perfil de extração',
+                'verbose_name_plural': 'Perfis de extração',
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.5 on 2026-10-17 13:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('noticias', '0008_perfilextracao'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='noticia',
+            name='imagem_largura',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='noticia',
+            name='imagem_altura',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='noticia',
+            name='imagem_bytes',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='noticia',
+            name='imagem_variantes',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.5 on 2026-10-17 13:48
+
+import django.contrib.postgres.fields
+import django.contrib.postgres.indexes
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('noticias', '0009_noticia_miniaturas'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='noticia',
+            name='simhash',
+            field=models.BigIntegerField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='noticia',
+            name='simhash_bandas',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.IntegerField(), blank=True, null=True, size=4),
+        ),
+        migrations.AddField(
+            model_name='noticia',
+            name='duplicata_de',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='duplicatas', to='noticias.noticia'),
+        ),
+        migrations.AddIndex(
+            model_name='noticia',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['simhash_bandas'], name='noticia_simhash_bandas_gin'),
+        ),
+    ]
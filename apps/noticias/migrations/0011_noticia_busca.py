@@ -0,0 +1,33 @@
+# Generated by Django 5.2.5 on 2026-10-17 14:30
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('noticias', '0010_noticia_simhash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='noticia',
+            name='busca',
+            field=django.contrib.postgres.search.SearchVectorField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunSQL(
+            sql="""
+                UPDATE noticias_noticia SET busca =
+                    setweight(to_tsvector('portuguese', coalesce(titulo, '')), 'A') ||
+                    setweight(to_tsvector('portuguese', coalesce(resumo, '')), 'B') ||
+                    setweight(to_tsvector('portuguese', coalesce(conteudo_completo, '')), 'C');
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.AddIndex(
+            model_name='noticia',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['busca'], name='noticia_busca_gin'),
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.5 on 2026-10-17 15:41
+
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+def popular_categorias(apps, schema_editor):
+    Categoria = apps.get_model('noticias', 'Categoria')
+    Fonte = apps.get_model('noticias', 'Fonte')
+    Noticia = apps.get_model('noticias', 'Noticia')
+
+    categorias = {}
+    grupos = (
+        Noticia.objects.exclude(categoria__isnull=True).exclude(categoria='')
+        .values('categoria').annotate(total=Count('id'), ultima=Max('publicado_em')).order_by()
+    )
+    for grupo in grupos:
+        categorias[grupo['categoria']] = Categoria(
+            nome=grupo['categoria'], total_noticias=grupo['total'], ultima_publicacao_em=grupo['ultima'],
+        )
+
+    fontes = (
+        Fonte.objects.filter(ativo=True, categoria_padrao__isnull=False).exclude(categoria_padrao='')
+        .values('categoria_padrao').annotate(total=Count('id')).order_by()
+    )
+    for grupo in fontes:
+        categoria = categorias.setdefault(grupo['categoria_padrao'], Categoria(nome=grupo['categoria_padrao']))
+        categoria.fontes_ativas = grupo['total']
+
+    Categoria.objects.bulk_create(
+        [categoria for nome, categoria in categorias.items() if nome.strip()]
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('noticias', '0011_noticia_busca'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Categoria',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nome', models.CharField(max_length=50, unique=True)),
+                ('total_noticias', models.PositiveIntegerField(default=0)),
+                ('fontes_ativas', models.PositiveIntegerField(default=0)),
+                ('ultima_publicacao_em', models.DateTimeField(blank=True, null=True)),
+                ('atualizado_em', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ('nome',),
+            },
+        ),
+        migrations.RunPython(popular_categorias, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.5 on 2026-10-17 16:20
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY não roda dentro de transação
+    atomic = False
+
+    dependencies = [
+        ('noticias', '0012_categoria'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='fonte',
+            index=models.Index(fields=['categoria_padrao'], name='fonte_categoria_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='noticia',
+            index=models.Index(fields=['-publicado_em', '-id'], name='noticia_pub_id_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='noticia',
+            index=models.Index(fields=['categoria', '-publicado_em', '-id'], include=['criado_em'], name='noticia_cat_pub_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='noticia',
+            index=models.Index(fields=['fonte', '-publicado_em', '-id'], name='noticia_fonte_pub_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='noticia',
+            index=models.Index(condition=models.Q(duplicata_de__isnull=True), fields=['-publicado_em', '-id'], name='noticia_principais_pub_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='noticia',
+            index=models.Index(fields=['-criado_em'], name='noticia_criado_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.5 on 2026-10-17 17:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('noticias', '0013_indices_consultas'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NoticiaArquivada',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('titulo', models.CharField(max_length=255)),
+                ('categoria', models.CharField(blank=True, max_length=50, null=True)),
+                ('link', models.URLField()),
+                ('publicado_em', models.DateTimeField()),
+                ('criado_em', models.DateTimeField()),
+                ('arquivado_em', models.DateTimeField(auto_now_add=True)),
+                ('conteudo', models.BinaryField()),
+                ('fonte', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='noticias_arquivadas', to='noticias.fonte')),
+            ],
+            options={
+                'verbose_name': 'Notícia arquivada',
+                'verbose_name_plural': 'Notícias arquivadas',
+                'unique_together': {('link', 'fonte')},
+            },
+        ),
+    ]
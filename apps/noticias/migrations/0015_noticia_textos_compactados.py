@@ -0,0 +1,105 @@
+# Generated by Django 5.2.5 on 2026-10-17 18:10
+
+import apps.noticias.campos
+from django.db import migrations, transaction
+
+CAMPOS = ('resumo', 'conteudo_completo')
+TAMANHO_LOTE = 1000
+
+
+def copiar_em_lotes(apps, origem, destino, a_partir_de=0):
+    """
+    Copia coluna a coluna em lotes por id, cada lote na sua transação.
+
+    Devolve o último id copiado.
+    """
+    Noticia = apps.get_model('noticias', 'Noticia')
+    ultimo_id = a_partir_de
+    while True:
+        lote = list(
+            Noticia.objects.filter(id__gt=ultimo_id).order_by('id')
+            .only('id', *[origem(campo) for campo in CAMPOS])[:TAMANHO_LOTE]
+        )
+        if not lote:
+            break
+        for noticia in lote:
+            for campo in CAMPOS:
+                setattr(noticia, destino(campo), getattr(noticia, origem(campo)))
+        with transaction.atomic():
+            Noticia.objects.bulk_update(lote, [destino(campo) for campo in CAMPOS])
+        ultimo_id = lote[-1].id
+    return ultimo_id
+
+
+def compactar(apps, schema_editor):
+    """
+    Copia os textos para as colunas compactadas e troca as colunas.
+
+    Durante um deploy gradual o código antigo continua inserindo notícias
+    enquanto a cópia roda. Por isso o último lote e a troca acontecem numa
+    transação só, com a tabela travada para escrita: o que entrou depois da
+    cópia principal é copiado antes das colunas antigas sumirem.
+    """
+    ultimo_id = copiar_em_lotes(apps, origem=lambda campo: campo, destino=lambda campo: f'{campo}_compactado')
+    with transaction.atomic():
+        schema_editor.execute('LOCK TABLE noticias_noticia IN SHARE ROW EXCLUSIVE MODE')
+        copiar_em_lotes(
+            apps, origem=lambda campo: campo, destino=lambda campo: f'{campo}_compactado', a_partir_de=ultimo_id
+        )
+        for campo in CAMPOS:
+            schema_editor.execute(f'ALTER TABLE noticias_noticia DROP COLUMN {campo}')
+            schema_editor.execute(f'ALTER TABLE noticias_noticia RENAME COLUMN {campo}_compactado TO {campo}')
+
+
+def descompactar(apps, schema_editor):
+    with transaction.atomic():
+        for campo in CAMPOS:
+            schema_editor.execute(f'ALTER TABLE noticias_noticia RENAME COLUMN {campo} TO {campo}_compactado')
+            schema_editor.execute(f'ALTER TABLE noticias_noticia ADD COLUMN {campo} text NULL')
+    copiar_em_lotes(apps, origem=lambda campo: f'{campo}_compactado', destino=lambda campo: campo)
+
+
+class Migration(migrations.Migration):
+    # Cada lote é commitado sozinho: a tabela não fica presa em uma transação longa
+    atomic = False
+
+    dependencies = [
+        ('noticias', '0014_noticiaarquivada'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='noticia',
+            name='resumo_compactado',
+            field=apps.noticias.campos.TextoCompactadoField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='noticia',
+            name='conteudo_completo_compactado',
+            field=apps.noticias.campos.TextoCompactadoField(blank=True, null=True),
+        ),
+        # A troca de colunas é feita em SQL dentro de compactar, junto com o último lote
+        migrations.SeparateDatabaseAndState(
+            database_operations=[migrations.RunPython(compactar, descompactar)],
+            state_operations=[
+                migrations.RemoveField(
+                    model_name='noticia',
+                    name='resumo',
+                ),
+                migrations.RemoveField(
+                    model_name='noticia',
+                    name='conteudo_completo',
+                ),
+                migrations.RenameField(
+                    model_name='noticia',
+                    old_name='resumo_compactado',
+                    new_name='resumo',
+                ),
+                migrations.RenameField(
+                    model_name='noticia',
+                    old_name='conteudo_completo_compactado',
+                    new_name='conteudo_completo',
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.5 on 2026-10-17 19:00
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('noticias', '0015_noticia_textos_compactados'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pendente', 'Na fila'), ('baixando', 'Baixando feeds'), ('processando', 'Processando'), ('concluida', 'Concluída'), ('falhou', 'Falhou')], default='pendente', max_length=20)),
+                ('origem', models.CharField(choices=[('agendada', 'Agendamento'), ('admin', 'Admin')], default='agendada', max_length=20)),
+                ('task_id', models.CharField(blank=True, default='', max_length=255)),
+                ('total_fontes', models.PositiveIntegerField(default=0)),
+                ('fontes_processadas', models.PositiveIntegerField(default=0)),
+                ('criadas', models.PositiveIntegerField(default=0)),
+                ('ignoradas', models.PositiveIntegerField(default=0)),
+                ('erros', models.PositiveIntegerField(default=0)),
+                ('erro', models.TextField(blank=True, default='')),
+                ('criado_em', models.DateTimeField(auto_now_add=True)),
+                ('iniciado_em', models.DateTimeField(blank=True, null=True)),
+                ('finalizado_em', models.DateTimeField(blank=True, null=True)),
+                ('usuario', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Importação',
+                'verbose_name_plural': 'Importações',
+                'ordering': ('-criado_em',),
+            },
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.5 on 2026-10-17 19:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('noticias', '0016_importrun'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportRunFonte',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nome_fonte', models.CharField(max_length=100)),
+                ('bytes', models.PositiveIntegerField(default=0)),
+                ('latencia', models.FloatField(blank=True, null=True)),
+                ('nao_modificado', models.BooleanField(default=False)),
+                ('tempo_parse', models.FloatField(default=0)),
+                ('tempo_persistencia', models.FloatField(default=0)),
+                ('entradas_vistas', models.PositiveIntegerField(default=0)),
+                ('criadas', models.PositiveIntegerField(default=0)),
+                ('ignoradas', models.PositiveIntegerField(default=0)),
+                ('puladas', models.PositiveIntegerField(default=0)),
+                ('raspagens', models.PositiveIntegerField(default=0)),
+                ('raspagens_sucesso', models.PositiveIntegerField(default=0)),
+                ('tempo_raspagem', models.FloatField(default=0)),
+                ('erro', models.TextField(blank=True, default='')),
+                ('criado_em', models.DateTimeField(auto_now_add=True)),
+                ('execucao', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='fontes', to='noticias.importrun')),
+                ('fonte', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='execucoes', to='noticias.fonte')),
+            ],
+            options={
+                'verbose_name': 'Importação por fonte',
+                'verbose_name_plural': 'Importações por fonte',
+                'ordering': ('-criado_em',),
+                'indexes': [models.Index(fields=['fonte', '-criado_em'], name='importrunfonte_fonte_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.5 on 2026-10-17 21:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('noticias', '0017_importrunfonte'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='fonte',
+            name='circuito_aberto_ate',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='fonte',
+            name='ultimo_erro',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='perfilextracao',
+            name='falhas_consecutivas',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='perfilextracao',
+            name='circuito_aberto_ate',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.5 on 2026-10-17 22:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('noticias', '0018_circuito'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='importrun',
+            name='status',
+            field=models.CharField(choices=[('pendente', 'Na fila'), ('processando', 'Processando'), ('concluida', 'Concluída'), ('falhou', 'Falhou')], default='pendente', max_length=20),
+        ),
+        migrations.AlterUniqueTogether(
+            name='importrunfonte',
+            unique_together={('execucao', 'fonte')},
+        ),
+    ]
@@ -0,0 +1,97 @@
+# Generated by Django 5.2.5 on 2026-10-17 23:05
+
+import hashlib
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models, transaction
+
+TAMANHO_LOTE = 1000
+
+# Cópia congelada de canonicalizacao.py: mudanças futuras no canonizador não
+# podem mudar o que esta migração grava
+PARAMETROS_RASTREAMENTO = {
+    'fbclid', 'gclid', 'dclid', 'msclkid', 'yclid', 'igshid', 'mc_cid', 'mc_eid',
+    '_ga', '_gl', 'ref_src', 'cmpid', 'xtor',
+}
+PORTAS_PADRAO = {'http': 80, 'https': 443}
+
+
+def canonicalizar_url(url):
+    partes = urlsplit(url.strip())
+    esquema = partes.scheme.lower()
+    if esquema == 'http':
+        esquema = 'https'
+    host = (partes.hostname or '').rstrip('.')
+    try:
+        porta = partes.port
+    except ValueError:
+        porta = None
+    if porta and porta != PORTAS_PADRAO.get(partes.scheme.lower()):
+        host = f'{host}:{porta}'
+    if partes.username or partes.password:
+        credenciais = partes.username or ''
+        if partes.password:
+            credenciais += f':{partes.password}'
+        host = f'{credenciais}@{host}'
+    parametros = sorted(
+        (chave, valor)
+        for chave, valor in parse_qsl(partes.query, keep_blank_values=True)
+        if not (chave.lower() in PARAMETROS_RASTREAMENTO or chave.lower().startswith('utm_'))
+    )
+    return urlunsplit((esquema, host, partes.path or '/', urlencode(parametros), ''))
+
+
+def hash_url(url):
+    digest = hashlib.sha256(canonicalizar_url(url).encode()).digest()
+    return int.from_bytes(digest[:8], 'big', signed=True)
+
+
+def preencher_em_lotes(apps, modelo):
+    Modelo = apps.get_model('noticias', modelo)
+    ultimo_id = 0
+    while True:
+        lote = list(Modelo.objects.filter(id__gt=ultimo_id).order_by('id').only('id', 'link')[:TAMANHO_LOTE])
+        if not lote:
+            break
+        for item in lote:
+            item.link_hash = hash_url(item.link)
+        with transaction.atomic():
+            Modelo.objects.bulk_update(lote, ['link_hash'])
+        ultimo_id = lote[-1].id
+
+
+def preencher_link_hash(apps, schema_editor):
+    preencher_em_lotes(apps, 'Noticia')
+    preencher_em_lotes(apps, 'NoticiaArquivada')
+
+
+class Migration(migrations.Migration):
+    # Lotes commitados um a um e índices criados com CONCURRENTLY: sem transação longa
+    atomic = False
+
+    dependencies = [
+        ('noticias', '0019_importacao_por_fonte'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='noticia',
+            name='link_hash',
+            field=models.BigIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='noticiaarquivada',
+            name='link_hash',
+            field=models.BigIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(preencher_link_hash, migrations.RunPython.noop),
+        AddIndexConcurrently(
+            model_name='noticia',
+            index=models.Index(fields=['fonte', 'link_hash'], name='noticia_fonte_link_hash_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='noticiaarquivada',
+            index=models.Index(fields=['fonte', 'link_hash'], name='noticiaarq_fonte_link_hash_idx'),
+        ),
+    ]
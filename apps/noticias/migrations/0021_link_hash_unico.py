@@ -0,0 +1,128 @@
+# Generated by Django 5.2.5 on 2026-10-18 10:40
+
+from collections import Counter
+
+from django.contrib.postgres.operations import RemoveIndexConcurrently
+from django.db import migrations, models, transaction
+from django.db.models import Count, F, Min
+from django.db.models.functions import Greatest
+
+
+def remover_variantes(apps, schema_editor):
+    """
+    Deixa uma notícia por (fonte, link_hash): a mais antiga (menor id).
+
+    As outras são variantes do mesmo link (utm_*, http/https...) gravadas
+    antes da deduplicação pela URL canônica. As duplicatas que apontavam
+    para elas passam a apontar para a que fica, e o índice de categorias é
+    descontado.
+    """
+    Noticia = apps.get_model('noticias', 'Noticia')
+    NoticiaArquivada = apps.get_model('noticias', 'NoticiaArquivada')
+    Categoria = apps.get_model('noticias', 'Categoria')
+
+    grupos = (
+        Noticia.objects.values('fonte_id', 'link_hash')
+        .annotate(total=Count('id'), manter=Min('id'))
+        .filter(total__gt=1)
+        .order_by()
+    )
+    for grupo in grupos:
+        with transaction.atomic():
+            variantes = list(
+                Noticia.objects.filter(fonte_id=grupo['fonte_id'], link_hash=grupo['link_hash'])
+                .exclude(id=grupo['manter'])
+                .values_list('id', 'categoria')
+            )
+            ids = [noticia_id for noticia_id, _ in variantes]
+            Noticia.objects.filter(id=grupo['manter'], duplicata_de_id__in=ids).update(duplicata_de=None)
+            Noticia.objects.filter(duplicata_de_id__in=ids).update(duplicata_de_id=grupo['manter'])
+            Noticia.objects.filter(id__in=ids).delete()
+            for categoria, total in Counter(categoria for _, categoria in variantes if categoria).items():
+                Categoria.objects.filter(nome=categoria).update(total_noticias=Greatest(F('total_noticias') - total, 0))
+
+    grupos = (
+        NoticiaArquivada.objects.values('fonte_id', 'link_hash')
+        .annotate(total=Count('id'), manter=Min('id'))
+        .filter(total__gt=1)
+        .order_by()
+    )
+    for grupo in grupos:
+        NoticiaArquivada.objects.filter(fonte_id=grupo['fonte_id'], link_hash=grupo['link_hash']).exclude(
+            id=grupo['manter']
+        ).delete()
+
+
+class Migration(migrations.Migration):
+    # Cada grupo de variantes é removido na sua própria transação; CONCURRENTLY não roda em transação
+    atomic = False
+
+    dependencies = [
+        ('noticias', '0020_link_hash'),
+    ]
+
+    operations = [
+        migrations.RunPython(remover_variantes, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='noticia',
+            name='link_hash',
+            field=models.BigIntegerField(editable=False),
+        ),
+        migrations.AlterField(
+            model_name='noticiaarquivada',
+            name='link_hash',
+            field=models.BigIntegerField(editable=False),
+        ),
+        # O índice único é criado CONCURRENTLY (sem bloquear escritas) e só depois vira a restrição;
+        # as chaves antigas saem no fim. link_hash vem primeiro: a busca do admin filtra só por ele
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(
+                    'CREATE UNIQUE INDEX CONCURRENTLY noticia_link_hash_fonte_uniq '
+                    'ON noticias_noticia (link_hash, fonte_id)',
+                    reverse_sql='DROP INDEX CONCURRENTLY IF EXISTS noticia_link_hash_fonte_uniq',
+                ),
+                migrations.RunSQL(
+                    'ALTER TABLE noticias_noticia ADD CONSTRAINT noticia_link_hash_fonte_uniq '
+                    'UNIQUE USING INDEX noticia_link_hash_fonte_uniq',
+                    reverse_sql='ALTER TABLE noticias_noticia DROP CONSTRAINT noticia_link_hash_fonte_uniq',
+                ),
+                migrations.RunSQL(
+                    'CREATE UNIQUE INDEX CONCURRENTLY noticiaarq_link_hash_fonte_uniq '
+                    'ON noticias_noticiaarquivada (link_hash, fonte_id)',
+                    reverse_sql='DROP INDEX CONCURRENTLY IF EXISTS noticiaarq_link_hash_fonte_uniq',
+                ),
+                migrations.RunSQL(
+                    'ALTER TABLE noticias_noticiaarquivada ADD CONSTRAINT noticiaarq_link_hash_fonte_uniq '
+                    'UNIQUE USING INDEX noticiaarq_link_hash_fonte_uniq',
+                    reverse_sql='ALTER TABLE noticias_noticiaarquivada DROP CONSTRAINT noticiaarq_link_hash_fonte_uniq',
+                ),
+            ],
+            state_operations=[
+                migrations.AddConstraint(
+                    model_name='noticia',
+                    constraint=models.UniqueConstraint(fields=('link_hash', 'fonte'), name='noticia_link_hash_fonte_uniq'),
+                ),
+                migrations.AddConstraint(
+                    model_name='noticiaarquivada',
+                    constraint=models.UniqueConstraint(fields=('link_hash', 'fonte'), name='noticiaarq_link_hash_fonte_uniq'),
+                ),
+            ],
+        ),
+        migrations.AlterUniqueTogether(
+            name='noticia',
+            unique_together=set(),
+        ),
+        migrations.AlterUniqueTogether(
+            name='noticiaarquivada',
+            unique_together=set(),
+        ),
+        RemoveIndexConcurrently(
+            model_name='noticia',
+            name='noticia_fonte_link_hash_idx',
+        ),
+        RemoveIndexConcurrently(
+            model_name='noticiaarquivada',
+            name='noticiaarq_fonte_link_hash_idx',
+        ),
+    ]
@@ -1,5 +1,13 @@
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+from django.conf import settings
 from django.db import models
 
+from .busca import atualizar_busca
+from .campos import TextoCompactadoField
+from .canonicalizacao import hash_url
+
 class Fonte(models.Model):
     nome = models.CharField(max_length=100)
     feed_url = models.URLField(unique=True)
@@ -7,23 +15,251 @@ class Fonte(models.Model):
     ativo = models.BooleanField(default=True)
     criado_em = models.DateTimeField(auto_now_add=True)
 
+    # Validadores HTTP da última resposta processada (GET condicional)
+    etag = models.CharField(max_length=255, blank=True, default='')
+    ultima_modificacao = models.CharField(max_length=64, blank=True, default='')  # header Last-Modified
+    hash_conteudo = models.CharField(max_length=64, blank=True, default='')  # sha256 do corpo do feed
+
+    # Agendamento adaptativo da coleta (ver agendamento.py)
+    intervalo_coleta = models.PositiveIntegerField(default=30 * 60)  # segundos entre coletas
+    intervalo_publicacao = models.FloatField(blank=True, null=True)  # média observada entre publicações (s)
+    falhas_consecutivas = models.PositiveIntegerField(default=0)
+    ultima_coleta_em = models.DateTimeField(blank=True, null=True)
+    proxima_coleta_em = models.DateTimeField(blank=True, null=True, db_index=True)
+
+    # Marca d'água da importação incremental: entrada mais recente já gravada
+    ultima_publicacao_em = models.DateTimeField(blank=True, null=True)
+    ultimo_link_hash = models.CharField(max_length=64, blank=True, default='')
+
+    # Disjuntor: com falhas_consecutivas >= NOTICIAS_CIRCUITO_FALHAS o feed não é baixado até esta data (ver circuito.py)
+    circuito_aberto_ate = models.DateTimeField(blank=True, null=True)
+    ultimo_erro = models.CharField(max_length=255, blank=True, default='')
+
+    class Meta:
+        indexes = [
+            # Filtro fonte__categoria_padrao da listagem de notícias
+            models.Index(fields=["categoria_padrao"], name="fonte_categoria_idx"),
+        ]
+
     def __str__(self):
         return self.nome
     
 class Noticia(models.Model):
     fonte = models.ForeignKey(Fonte, on_delete=models.CASCADE, related_name="noticias")
     titulo = models.CharField(max_length=255)
-    resumo = models.TextField(blank=True, null=True)
-    conteudo_completo = models.TextField(blank=True, null=True)  # NOVO CAMPO
+    # Textos grandes e HTML: gravados compactados em bytea (ver campos.py)
+    resumo = TextoCompactadoField(blank=True, null=True)
+    conteudo_completo = TextoCompactadoField(blank=True, null=True)  # NOVO CAMPO
     categoria = models.CharField(max_length=50, blank=True, null=True)  # NOVO CAMPO
     link = models.URLField()
+    # Hash da URL canônica (ver canonicalizacao.py): chave da deduplicação e das buscas por link
+    link_hash = models.BigIntegerField(editable=False)
     imagem = models.URLField(blank=True, null=True)
+    # Cópia local da imagem (ver imagens.py): dimensões/tamanho do original e miniaturas
+    imagem_largura = models.PositiveIntegerField(blank=True, null=True)
+    imagem_altura = models.PositiveIntegerField(blank=True, null=True)
+    imagem_bytes = models.PositiveIntegerField(blank=True, null=True)
+    imagem_variantes = models.JSONField(default=dict, blank=True)  # {"320": {"webp": caminho, "jpeg": caminho}}
     publicado_em = models.DateTimeField()
     criado_em = models.DateTimeField(auto_now_add=True)
 
+    # Detecção de quase-duplicatas entre fontes (ver duplicatas.py)
+    simhash = models.BigIntegerField(blank=True, null=True, db_index=True)
+    simhash_bandas = ArrayField(models.IntegerField(), size=4, blank=True, null=True)
+    duplicata_de = models.ForeignKey(
+        "self", on_delete=models.SET_NULL, blank=True, null=True, related_name="duplicatas"
+    )
+
+    # Busca textual (português): titulo, resumo e conteudo_completo (ver busca.py)
+    busca = SearchVectorField(blank=True, null=True, editable=False)
+
+    class Meta:
+        # Deduplicação pela URL canônica (8 bytes) em vez do link inteiro (varchar).
+        # link_hash primeiro: o índice serve também a busca do admin, que não filtra por fonte
+        constraints = [models.UniqueConstraint(fields=["link_hash", "fonte"], name="noticia_link_hash_fonte_uniq")]
+        indexes = [
+            GinIndex(fields=["simhash_bandas"], name="noticia_simhash_bandas_gin"),
+            GinIndex(fields=["busca"], name="noticia_busca_gin"),
+            # Consultas quentes da API/admin (ver o comando explicar_consultas_noticias)
+            models.Index(fields=["-publicado_em", "-id"], name="noticia_pub_id_idx"),
+            models.Index(fields=["categoria", "-publicado_em", "-id"], include=["criado_em"], name="noticia_cat_pub_idx"),
+            models.Index(fields=["fonte", "-publicado_em", "-id"], name="noticia_fonte_pub_idx"),
+            models.Index(
+                fields=["-publicado_em", "-id"],
+                condition=models.Q(duplicata_de__isnull=True),
+                name="noticia_principais_pub_idx",
+            ),
+            models.Index(fields=["-criado_em"], name="noticia_criado_idx"),
+        ]
+
+    def __str__(self):
+        return self.titulo
+
+    def save(self, *args, **kwargs):
+        self.link_hash = hash_url(self.link) if self.link else None
+        super().save(*args, **kwargs)
+        # O tsvector é calculado pelo Postgres, com os textos já descompactados
+        atualizar_busca(Noticia.objects, [self])
+
+
+
+class PerfilExtracao(models.Model):
+    """Seletor de conteúdo aprendido por domínio e custo acumulado do scraping."""
+    dominio = models.CharField(max_length=255, unique=True)
+    seletor = models.CharField(max_length=100, blank=True, default='')
+    tentativas = models.PositiveIntegerField(default=0)
+    sucessos = models.PositiveIntegerField(default=0)
+    caracteres_extraidos = models.BigIntegerField(default=0)
+    tempo_download = models.FloatField(default=0)  # segundos acumulados
+    tempo_extracao = models.FloatField(default=0)  # segundos acumulados (parse + seletores)
+    # Disjuntor do domínio: timeouts/erros de conexão/5xx seguidos (ver circuito.py)
+    falhas_consecutivas = models.PositiveIntegerField(default=0)
+    circuito_aberto_ate = models.DateTimeField(blank=True, null=True)
+    atualizado_em = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Perfil de extração"
+        verbose_name_plural = "Perfis de extração"
+
+    def __str__(self):
+        return self.dominio
+
+    @property
+    def rendimento(self):
+        return self.sucessos / self.tentativas if self.tentativas else None
+
+    @property
+    def tempo_medio(self):
+        if not self.tentativas:
+            return None
+        return (self.tempo_download + self.tempo_extracao) / self.tentativas
+
+
+class Categoria(models.Model):
+    """
+    Índice de categorias mantido durante a importação (ver categorias.py).
+
+    Evita os DISTINCT sobre Fonte e Noticia a cada chamada de /categorias/.
+    """
+    nome = models.CharField(max_length=50, unique=True)
+    total_noticias = models.PositiveIntegerField(default=0)
+    fontes_ativas = models.PositiveIntegerField(default=0)
+    ultima_publicacao_em = models.DateTimeField(blank=True, null=True)
+    atualizado_em = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ("nome",)
+
+    def __str__(self):
+        return self.nome
+
+
+class NoticiaArquivada(models.Model):
+    """
+    Notícia antiga retirada da tabela principal pela retenção (ver arquivamento.py).
+
+    Guarda só o que identifica a notícia, mais o conteúdo compactado com zlib;
+    o id é o mesmo que ela tinha em Noticia.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    fonte = models.ForeignKey(Fonte, on_delete=models.CASCADE, related_name="noticias_arquivadas")
+    titulo = models.CharField(max_length=255)
+    categoria = models.CharField(max_length=50, blank=True, null=True)
+    link = models.URLField()
+    link_hash = models.BigIntegerField(editable=False)
+    publicado_em = models.DateTimeField()
+    criado_em = models.DateTimeField()
+    arquivado_em = models.DateTimeField(auto_now_add=True)
+    conteudo = models.BinaryField()  # JSON compactado: resumo, conteudo_completo, imagem...
+
     class Meta:
-        unique_together = ("link", "fonte")
+        constraints = [models.UniqueConstraint(fields=["link_hash", "fonte"], name="noticiaarq_link_hash_fonte_uniq")]
+        verbose_name = "Notícia arquivada"
+        verbose_name_plural = "Notícias arquivadas"
 
     def __str__(self):
         return self.titulo
 
+
+class ImportRun(models.Model):
+    """Uma execução de importar_noticias_task, com o progresso acompanhado no admin."""
+    PENDENTE = "pendente"
+    PROCESSANDO = "processando"
+    CONCLUIDA = "concluida"
+    FALHOU = "falhou"
+    STATUS = [
+        (PENDENTE, "Na fila"),
+        (PROCESSANDO, "Processando"),
+        (CONCLUIDA, "Concluída"),
+        (FALHOU, "Falhou"),
+    ]
+    EM_ANDAMENTO = (PENDENTE, PROCESSANDO)
+
+    ORIGENS = [("agendada", "Agendamento"), ("admin", "Admin")]
+
+    status = models.CharField(max_length=20, choices=STATUS, default=PENDENTE)
+    origem = models.CharField(max_length=20, choices=ORIGENS, default="agendada")
+    usuario = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, blank=True, null=True)
+    task_id = models.CharField(max_length=255, blank=True, default="")
+    total_fontes = models.PositiveIntegerField(default=0)
+    fontes_processadas = models.PositiveIntegerField(default=0)
+    criadas = models.PositiveIntegerField(default=0)
+    ignoradas = models.PositiveIntegerField(default=0)
+    erros = models.PositiveIntegerField(default=0)  # fontes cujo feed não pôde ser baixado
+    erro = models.TextField(blank=True, default="")  # exceção que interrompeu a execução
+    criado_em = models.DateTimeField(auto_now_add=True)
+    iniciado_em = models.DateTimeField(blank=True, null=True)
+    finalizado_em = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ("-criado_em",)
+        verbose_name = "Importação"
+        verbose_name_plural = "Importações"
+
+    def __str__(self):
+        return f"Importação #{self.pk} ({self.get_status_display()})"
+
+    @property
+    def progresso(self):
+        return self.fontes_processadas / self.total_fontes if self.total_fontes else None
+
+    @property
+    def duracao(self):
+        if not self.iniciado_em or not self.finalizado_em:
+            return None
+        return (self.finalizado_em - self.iniciado_em).total_seconds()
+
+
+class ImportRunFonte(models.Model):
+    """Telemetria de uma fonte dentro de uma ImportRun: onde foi o tempo da coleta."""
+    execucao = models.ForeignKey(ImportRun, on_delete=models.CASCADE, related_name="fontes")
+    fonte = models.ForeignKey(Fonte, on_delete=models.SET_NULL, blank=True, null=True, related_name="execucoes")
+    nome_fonte = models.CharField(max_length=100)  # preservado se a fonte for apagada
+    bytes = models.PositiveIntegerField(default=0)  # corpo do feed baixado
+    latencia = models.FloatField(blank=True, null=True)  # download do feed (s)
+    nao_modificado = models.BooleanField(default=False)  # 304 ou mesmo hash do corpo
+    tempo_parse = models.FloatField(default=0)  # feedparser (s)
+    tempo_persistencia = models.FloatField(default=0)  # filtro, impressões e gravação (s)
+    entradas_vistas = models.PositiveIntegerField(default=0)
+    criadas = models.PositiveIntegerField(default=0)
+    ignoradas = models.PositiveIntegerField(default=0)  # já existentes
+    puladas = models.PositiveIntegerField(default=0)  # abaixo da marca d'água
+    raspagens = models.PositiveIntegerField(default=0)  # páginas raspadas depois (raspar_conteudo_task)
+    raspagens_sucesso = models.PositiveIntegerField(default=0)
+    tempo_raspagem = models.FloatField(default=0)  # s
+    erro = models.TextField(blank=True, default="")
+    criado_em = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ("-criado_em",)
+        unique_together = ("execucao", "fonte")  # uma linha por fonte; novas tentativas sobrescrevem
+        indexes = [models.Index(fields=["fonte", "-criado_em"], name="importrunfonte_fonte_idx")]
+        verbose_name = "Importação por fonte"
+        verbose_name_plural = "Importações por fonte"
+
+    def __str__(self):
+        return f"{self.nome_fonte} (importação #{self.execucao_id})"
+
+    @property
+    def tempo_total(self):
+        return (self.latencia or 0) + self.tempo_parse + self.tempo_persistencia + self.tempo_raspagem
@@ -0,0 +1,108 @@
+import base64
+from datetime import datetime
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Paginação por chave (publicado_em, id), do mais novo para o mais antigo.
+
+    Cada página é um `WHERE (publicado_em, id) < (cursor) ORDER BY ... LIMIT n`,
+    então o custo não cresce com a profundidade da rolagem e não há COUNT(*).
+    Só avança (rolagem infinita): a resposta traz `next` e `results`.
+    """
+    page_size = api_settings.PAGE_SIZE
+    cursor_query_param = 'cursor'
+    ordering = ('-publicado_em', '-id')
+    invalid_cursor_message = 'Cursor inválido'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        queryset = queryset.order_by(*self.ordering)
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            queryset = self.apos_cursor(queryset, *self.decode_cursor(cursor))
+
+        itens = list(queryset[:self.page_size + 1])
+        self.has_next = len(itens) > self.page_size
+        itens = itens[:self.page_size]
+        self.last_item = itens[-1] if itens else None
+        return itens
+
+    def apos_cursor(self, queryset, publicado_em, pk):
+        """Itens depois do cursor: (publicado_em, id) < (publicado_em, pk)."""
+        # O publicado_em__lte dá ao Postgres o limite da varredura no índice
+        return queryset.filter(publicado_em__lte=publicado_em).filter(
+            Q(publicado_em__lt=publicado_em) | Q(id__lt=pk)
+        )
+
+    def encode_cursor(self, item):
+        valor = f'{item.publicado_em.isoformat()}|{item.pk}'
+        return base64.urlsafe_b64encode(valor.encode()).decode()
+
+    def decode_cursor(self, cursor):
+        try:
+            publicado_em, pk = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+            return datetime.fromisoformat(publicado_em), int(pk)
+        except (TypeError, ValueError, UnicodeDecodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.last_item))
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': None,
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+
+class PaginacaoNoticias(BasePagination):
+    """
+    Paginação por número de página (padrão do projeto) ou por cursor.
+
+    O modo cursor é usado quando a requisição traz ?cursor= ou
+    ?paginacao=cursor; nele a ordenação é sempre (publicado_em, id) desc,
+    mesmo com ?ordering= ou ?search=.
+    """
+
+    def __init__(self):
+        self.paginador = None
+
+    def usa_cursor(self, request):
+        return (
+            KeysetPagination.cursor_query_param in request.query_params
+            or request.query_params.get('paginacao') == 'cursor'
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.paginador = KeysetPagination() if self.usa_cursor(request) else PageNumberPagination()
+        return self.paginador.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return self.paginador.get_paginated_response(data)
+
+    def get_paginated_response_schema(self, schema):
+        return PageNumberPagination().get_paginated_response_schema(schema)
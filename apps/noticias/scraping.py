@@ -0,0 +1,457 @@
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from urllib.parse import urlsplit
+
+import requests
+from bs4 import BeautifulSoup
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F, Q
+from django.utils import timezone
+from requests.adapters import HTTPAdapter
+
+from . import circuito
+from .busca import atualizar_busca
+from .cache import invalidar_cache_api
+from .canonicalizacao import hash_url
+from .duplicatas import calcular_impressao
+from .models import Noticia, PerfilExtracao
+
+try:
+    import lxml  # noqa: F401
+    PARSER_HTML = 'lxml'
+except ImportError:
+    PARSER_HTML = 'html.parser'
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+# Abaixo deste tamanho o conteúdo do feed é considerado só um resumo
+TAMANHO_MINIMO_CONTEUDO = 200
+TAMANHO_MAXIMO_CONTEUDO = 15000
+
+# Seletores comuns para o corpo do artigo, em ordem de preferência
+SELETORES_CONTEUDO = [
+    'article',
+    '.post-content',
+    '.entry-content',
+    '.article-content',
+    '.content',
+    '[class*="content"]',
+    'main',
+]
+
+# Cache de resultados do scraping (CACHES['default'])
+PREFIXO_CACHE = 'noticias:scraping'
+CHAVE_ACERTOS = f'{PREFIXO_CACHE}:stats:acertos'
+CHAVE_FALTAS = f'{PREFIXO_CACHE}:stats:faltas'
+FALHA = '__falha__'  # marcador de cache negativo (404, timeout, página sem conteúdo)
+
+
+class LimitadorPorDominio:
+    """
+    Política de cortesia por domínio, compartilhada entre as threads do processo.
+
+    Garante no máximo `max_simultaneas` requisições abertas por host e um
+    intervalo mínimo entre o início de duas requisições ao mesmo host.
+    """
+
+    def __init__(self, intervalo, max_simultaneas):
+        self.intervalo = intervalo
+        self.max_simultaneas = max_simultaneas
+        self._lock = threading.Lock()
+        self._ultimo_acesso = {}
+        self._semaforos = {}
+
+    def _semaforo(self, dominio):
+        with self._lock:
+            if dominio not in self._semaforos:
+                self._semaforos[dominio] = threading.BoundedSemaphore(self.max_simultaneas)
+            return self._semaforos[dominio]
+
+    def _reservar_horario(self, dominio):
+        # Reserva o próximo horário livre do domínio e devolve quanto falta para ele
+        with self._lock:
+            agora = time.monotonic()
+            horario = max(agora, self._ultimo_acesso.get(dominio, 0) + self.intervalo)
+            self._ultimo_acesso[dominio] = horario
+            return horario - agora
+
+    def executar(self, dominio, funcao, *args, **kwargs):
+        with self._semaforo(dominio):
+            espera = self._reservar_horario(dominio)
+            if espera > 0:
+                time.sleep(espera)
+            return funcao(*args, **kwargs)
+
+
+_sessao = None
+_limitador = None
+_lock_global = threading.Lock()
+
+# Seletor aprendido por domínio (cópia em memória de PerfilExtracao, relida a cada lote)
+_perfis = {}
+
+
+def obter_sessao():
+    """Session compartilhada, com pool de conexões keep-alive por host."""
+    global _sessao
+    with _lock_global:
+        if _sessao is None:
+            sessao = requests.Session()
+            sessao.headers['User-Agent'] = USER_AGENT
+            adapter = HTTPAdapter(
+                pool_connections=settings.NOTICIAS_SCRAPING_POOL_HOSTS,
+                pool_maxsize=settings.NOTICIAS_SCRAPING_POOL_CONEXOES,
+            )
+            sessao.mount('http://', adapter)
+            sessao.mount('https://', adapter)
+            _sessao = sessao
+        return _sessao
+
+
+def obter_limitador():
+    global _limitador
+    with _lock_global:
+        if _limitador is None:
+            _limitador = LimitadorPorDominio(
+                intervalo=settings.NOTICIAS_SCRAPING_INTERVALO_DOMINIO,
+                max_simultaneas=settings.NOTICIAS_SCRAPING_MAX_POR_DOMINIO,
+            )
+        return _limitador
+
+
+def _texto_do_conteudo(content):
+    # Remover elementos indesejados
+    for unwanted in content.select('script, style, nav, footer, aside, .ads, .advertisement'):
+        unwanted.decompose()
+
+    # Extrair texto mantendo parágrafos
+    paragraphs = content.find_all(['p', 'div', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6'])
+    text_content = '\n\n'.join([p.get_text().strip() for p in paragraphs if p.get_text().strip()])
+    return text_content[:TAMANHO_MAXIMO_CONTEUDO] if text_content else None
+
+
+def extrair_do_html(html, seletor_preferido=None):
+    """
+    Extrai o texto do artigo de uma página HTML.
+
+    O seletor que funcionou da última vez para o domínio é tentado primeiro;
+    os demais seletores comuns servem de fallback. Retorna (texto, seletor).
+    """
+    soup = BeautifulSoup(html, PARSER_HTML)
+
+    seletores = list(SELETORES_CONTEUDO)
+    if seletor_preferido:
+        seletores = [seletor_preferido] + [s for s in seletores if s != seletor_preferido]
+
+    for seletor in seletores:
+        content = soup.select_one(seletor)
+        if content is None:
+            continue
+        texto = _texto_do_conteudo(content)
+        if texto:
+            return texto, seletor
+        # O seletor preferido achou um elemento vazio: a página mudou, tenta os outros
+        if seletor != seletor_preferido:
+            return None, seletor
+    return None, None
+
+
+def extrair_conteudo(url, timeout=10):
+    """
+    Baixa a página e extrai o artigo usando o perfil aprendido do domínio.
+
+    Retorna um dict com conteudo, dominio, seletor usado e os tempos de
+    download e de extração (s). Não acessa o banco: os perfis são lidos do
+    cache em memória (ver carregar_perfis), então pode rodar em qualquer thread.
+    """
+    dominio = urlsplit(url).hostname or ''
+    resultado = {
+        'conteudo': None, 'dominio': dominio, 'seletor': None,
+        'tempo_download': 0.0, 'tempo_extracao': 0.0, 'indisponivel': False,
+    }
+    inicio = time.monotonic()
+    try:
+        response = obter_limitador().executar(dominio, obter_sessao().get, url, timeout=timeout)
+        response.raise_for_status()
+        resultado['tempo_download'] = time.monotonic() - inicio
+
+        inicio = time.monotonic()
+        resultado['conteudo'], resultado['seletor'] = extrair_do_html(response.content, _perfis.get(dominio))
+        resultado['tempo_extracao'] = time.monotonic() - inicio
+    except Exception as e:
+        resultado['tempo_download'] = resultado['tempo_download'] or time.monotonic() - inicio
+        resultado['indisponivel'] = site_indisponivel(e)
+        logger.warning(f"Erro no web scraping para {url}: {e}")
+    return resultado
+
+
+def site_indisponivel(erro):
+    """Timeout, falha de conexão ou 5xx: conta para o circuito do domínio (um 404 não conta)."""
+    if isinstance(erro, (requests.ConnectionError, requests.Timeout)):
+        return True
+    resposta = getattr(erro, 'response', None)
+    return isinstance(erro, requests.HTTPError) and resposta is not None and resposta.status_code >= 500
+
+
+def extrair_conteudo_completo_web(url, timeout=10):
+    """Extrai conteúdo completo fazendo scraping da página original"""
+    return extrair_conteudo(url, timeout=timeout)['conteudo']
+
+
+def carregar_perfis(dominios):
+    """
+    Carrega do banco para a memória os seletores aprendidos dos domínios.
+
+    Relê a cada lote (uma consulta só), assim um perfil editado ou apagado no
+    admin vale a partir do próximo lote em todos os workers.
+    """
+    encontrados = dict(
+        PerfilExtracao.objects.filter(dominio__in=dominios).values_list('dominio', 'seletor')
+    )
+    for dominio in dominios:
+        _perfis[dominio] = encontrados.get(dominio) or None
+
+
+def carregar_circuitos(dominios):
+    """Estado atual do circuito de cada domínio: {dominio: (falhas_consecutivas, circuito_aberto_ate)}."""
+    return {
+        dominio: (falhas, aberto_ate)
+        for dominio, falhas, aberto_ate in PerfilExtracao.objects.filter(dominio__in=dominios)
+        .values_list('dominio', 'falhas_consecutivas', 'circuito_aberto_ate')
+    }
+
+
+def registrar_extracoes(resultados):
+    """
+    Acumula por domínio o rendimento e o tempo das extrações, guarda o
+    seletor que funcionou e atualiza o circuito do domínio: qualquer resposta
+    do site fecha o circuito; só falhas de disponibilidade contam para abrir.
+    Uma escrita por domínio, feita na thread principal. Devolve os domínios
+    cujo circuito estava aberto e fechou agora (a sonda respondeu).
+    """
+    por_dominio = {}
+    for resultado in resultados:
+        if resultado.get('do_cache'):
+            continue
+        dados = por_dominio.setdefault(resultado['dominio'], {
+            'tentativas': 0, 'sucessos': 0, 'caracteres': 0,
+            'tempo_download': 0.0, 'tempo_extracao': 0.0, 'seletor': None,
+            'respondeu': False, 'indisponiveis': 0,
+        })
+        dados['tentativas'] += 1
+        if resultado.get('indisponivel'):
+            dados['indisponiveis'] += 1
+        else:
+            dados['respondeu'] = True
+        dados['tempo_download'] += resultado['tempo_download']
+        dados['tempo_extracao'] += resultado['tempo_extracao']
+        if resultado['conteudo']:
+            dados['sucessos'] += 1
+            dados['caracteres'] += len(resultado['conteudo'])
+            dados['seletor'] = resultado['seletor']
+
+    fechados = []
+    for dominio, dados in por_dominio.items():
+        perfil, _ = PerfilExtracao.objects.get_or_create(dominio=dominio)
+        campos = {
+            'tentativas': F('tentativas') + dados['tentativas'],
+            'sucessos': F('sucessos') + dados['sucessos'],
+            'caracteres_extraidos': F('caracteres_extraidos') + dados['caracteres'],
+            'tempo_download': F('tempo_download') + dados['tempo_download'],
+            'tempo_extracao': F('tempo_extracao') + dados['tempo_extracao'],
+        }
+        if dados['seletor'] and dados['seletor'] != perfil.seletor:
+            campos['seletor'] = dados['seletor']
+            _perfis[dominio] = dados['seletor']
+        if dados['respondeu']:
+            falhas, aberto_ate = 0, None
+            if perfil.falhas_consecutivas >= settings.NOTICIAS_CIRCUITO_FALHAS:
+                fechados.append(dominio)
+        else:
+            falhas, aberto_ate = perfil.falhas_consecutivas, perfil.circuito_aberto_ate
+            for _ in range(dados['indisponiveis']):
+                falhas, aberto_ate = circuito.registrar(falhas, sucesso=False)
+                # Abriu (ou a sonda falhou): o resto do lote não conta, senão o recuo
+                # dobraria uma vez por página e não por sonda
+                if aberto_ate:
+                    break
+            if aberto_ate and perfil.falhas_consecutivas < settings.NOTICIAS_CIRCUITO_FALHAS:
+                logger.warning(f'Circuito do domínio {dominio} aberto após {falhas} falhas seguidas')
+        campos['falhas_consecutivas'] = falhas
+        campos['circuito_aberto_ate'] = aberto_ate
+        PerfilExtracao.objects.filter(pk=perfil.pk).update(**campos)
+    return fechados
+
+
+def pendentes_dos_dominios(dominios, excluir=()):
+    """
+    Notícias recentes desses domínios que ainda precisam de raspagem.
+
+    Usado quando o circuito de um domínio fecha: as notícias puladas
+    enquanto ele estava aberto voltam para a fila. A janela cobre o maior
+    tempo que um circuito fica aberto, com folga.
+    """
+    if not dominios:
+        return []
+    desde = timezone.now() - timedelta(seconds=2 * settings.NOTICIAS_CIRCUITO_RECUO_MAXIMO)
+    links = Q()
+    for dominio in dominios:
+        links |= Q(link__startswith=f'https://{dominio}/') | Q(link__startswith=f'http://{dominio}/')
+    candidatas = (
+        Noticia.objects.filter(links, criado_em__gte=desde)
+        .exclude(id__in=list(excluir))
+        .only('id', 'conteudo_completo')
+    )
+    return [noticia.id for noticia in candidatas if precisa_raspagem(noticia.conteudo_completo)]
+
+
+def _chave_cache(url):
+    # Variações do mesmo link (http/https, utm_*, fragmento) compartilham o cache
+    return f'{PREFIXO_CACHE}:{hash_url(url)}'
+
+
+def _incrementar(chave):
+    try:
+        cache.incr(chave)
+    except ValueError:
+        # Chave ainda não existe
+        cache.set(chave, 1, timeout=None)
+
+
+def extrair_conteudo_com_cache(url, timeout=10):
+    """
+    extrair_conteudo com cache por URL canônica.
+
+    Sucessos ficam em cache por NOTICIAS_SCRAPING_CACHE_TTL e falhas por
+    NOTICIAS_SCRAPING_CACHE_TTL_FALHA (cache negativo), assim uma página que
+    dá 404 ou timeout não é tentada de novo a cada ciclo. Retorna o mesmo dict
+    de extrair_conteudo, com `do_cache=True` quando veio do cache.
+    """
+    chave = _chave_cache(url)
+    valor = cache.get(chave)
+    if valor is not None:
+        _incrementar(CHAVE_ACERTOS)
+        return {
+            'conteudo': None if valor == FALHA else valor,
+            'dominio': urlsplit(url).hostname or '',
+            'do_cache': True,
+        }
+
+    _incrementar(CHAVE_FALTAS)
+    resultado = extrair_conteudo(url, timeout=timeout)
+    if resultado['conteudo']:
+        cache.set(chave, resultado['conteudo'], timeout=settings.NOTICIAS_SCRAPING_CACHE_TTL)
+    else:
+        cache.set(chave, FALHA, timeout=settings.NOTICIAS_SCRAPING_CACHE_TTL_FALHA)
+    resultado['do_cache'] = False
+    return resultado
+
+
+def estatisticas_cache_scraping():
+    """
+    Contadores de acertos (hits) e faltas (misses) do cache de scraping desde
+    o último reset. Falta não é falha: só quer dizer que a página foi baixada.
+    """
+    acertos = cache.get(CHAVE_ACERTOS) or 0
+    faltas = cache.get(CHAVE_FALTAS) or 0
+    total = acertos + faltas
+    return {
+        'acertos': acertos,
+        'faltas': faltas,
+        'taxa_acerto': round(acertos / total, 4) if total else None,
+    }
+
+
+def zerar_estatisticas_cache_scraping():
+    cache.delete_many([CHAVE_ACERTOS, CHAVE_FALTAS])
+
+
+def precisa_raspagem(conteudo):
+    """Conteúdo vazio ou muito curto indica que o feed só trouxe um resumo."""
+    return not conteudo or len(conteudo.strip()) < TAMANHO_MINIMO_CONTEUDO
+
+
+def _intercalar_por_dominio(noticias):
+    # Alterna os domínios na fila para as threads não ficarem todas esperando o mesmo host
+    filas = defaultdict(deque)
+    for noticia in noticias:
+        filas[urlsplit(noticia.link).hostname or ''].append(noticia)
+    ordenadas = []
+    while filas:
+        for dominio in list(filas):
+            ordenadas.append(filas[dominio].popleft())
+            if not filas[dominio]:
+                del filas[dominio]
+    return ordenadas
+
+
+def raspar_noticias(noticia_ids, max_workers=None):
+    """
+    Completa `conteudo_completo` das notícias cujo feed trouxe só um resumo.
+
+    As páginas são baixadas em paralelo (NOTICIAS_SCRAPING_WORKERS), respeitando
+    o limite por domínio. Domínios com circuito aberto ficam de fora; quando o
+    prazo do circuito vence, só uma página do domínio é tentada, com timeout
+    curto (sonda). Retorna quantas notícias foram raspadas, atualizadas e
+    bloqueadas pelo circuito, mais as `pendentes`: notícias puladas antes
+    por domínios cujo circuito fechou nesta rodada, para raspar de novo.
+    """
+    noticias = [
+        noticia for noticia in Noticia.objects.filter(id__in=noticia_ids).only('id', 'titulo', 'resumo', 'link', 'conteudo_completo')
+        if precisa_raspagem(noticia.conteudo_completo)
+    ]
+    if not noticias:
+        return {'tentativas': 0, 'atualizadas': 0, 'bloqueadas': 0, 'pendentes': []}
+
+    dominios = {urlsplit(noticia.link).hostname or '' for noticia in noticias}
+    carregar_perfis(dominios)
+    circuitos = carregar_circuitos(dominios)
+    liberadas, sondas = [], set()
+    for noticia in noticias:
+        dominio = urlsplit(noticia.link).hostname or ''
+        situacao = circuito.estado(*circuitos.get(dominio, (0, None)))
+        if situacao == circuito.ABERTO or (situacao == circuito.SONDA and dominio in sondas):
+            continue
+        if situacao == circuito.SONDA:
+            sondas.add(dominio)
+        liberadas.append(noticia)
+    bloqueadas = len(noticias) - len(liberadas)
+    if not liberadas:
+        return {'tentativas': 0, 'atualizadas': 0, 'bloqueadas': bloqueadas, 'pendentes': []}
+
+    def extrair(noticia):
+        dominio = urlsplit(noticia.link).hostname or ''
+        timeout = settings.NOTICIAS_CIRCUITO_TIMEOUT_SONDA if dominio in sondas else 10
+        return extrair_conteudo_com_cache(noticia.link, timeout=timeout)
+
+    noticias = _intercalar_por_dominio(liberadas)
+    max_workers = max_workers or settings.NOTICIAS_SCRAPING_WORKERS
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='noticias-scraping') as executor:
+        resultados = list(executor.map(extrair, noticias))
+
+    atualizadas = []
+    for noticia, resultado in zip(noticias, resultados):
+        if resultado['conteudo']:
+            noticia.conteudo_completo = resultado['conteudo']
+            calcular_impressao(noticia)
+            atualizadas.append(noticia)
+    if atualizadas:
+        Noticia.objects.bulk_update(atualizadas, ['conteudo_completo', 'simhash', 'simhash_bandas'])
+        atualizar_busca(Noticia.objects, atualizadas)
+        invalidar_cache_api()
+    fechados = registrar_extracoes(resultados)
+    pendentes = pendentes_dos_dominios(fechados, excluir=noticia_ids)
+
+    return {
+        'tentativas': len(noticias),
+        'atualizadas': len(atualizadas),
+        'bloqueadas': bloqueadas,
+        'pendentes': pendentes,
+    }
@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from .imagens import urls_miniaturas
 from .models import Noticia, Fonte
 
 class FonteSerializer(serializers.ModelSerializer):
@@ -6,9 +7,48 @@ class FonteSerializer(serializers.ModelSerializer):
         model = Fonte
         fields = ['id', 'nome', 'categoria_padrao']
 
-class NoticiaSerializer(serializers.ModelSerializer):
+class CamposDinamicosMixin:
+    """Permite escolher os campos na criação: Serializer(..., fields=[...], omit=[...])."""
+
+    def __init__(self, *args, fields=None, omit=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for nome in set(self.fields) - set(fields):
+                self.fields.pop(nome)
+        for nome in omit or ():
+            self.fields.pop(nome, None)
+
+
+class NoticiaSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     fonte = FonteSerializer(read_only=True)
+    miniaturas = serializers.SerializerMethodField()
+    total_duplicatas = serializers.SerializerMethodField()
 
     class Meta:
         model = Noticia
-        fields = ['id', 'titulo', 'resumo', 'conteudo_completo', 'categoria', 'link', 'imagem', 'publicado_em', 'fonte']
\ No newline at end of file
+        fields = ['id', 'titulo', 'resumo', 'conteudo_completo', 'categoria', 'link', 'imagem', 'imagem_largura', 'imagem_altura', 'miniaturas', 'publicado_em', 'fonte', 'duplicata_de', 'total_duplicatas']
+
+    # Campos padrão da listagem: tudo menos o conteúdo completo (até 15 mil caracteres)
+    CAMPOS_RESUMO = [campo for campo in Meta.fields if campo != 'conteudo_completo']
+
+    # Colunas do banco que cada campo precisa ler (para o .only() da view)
+    COLUNAS = {
+        'miniaturas': ['imagem_variantes'],
+        'fonte': ['fonte__id', 'fonte__nome', 'fonte__categoria_padrao'],
+        'total_duplicatas': [],  # anotação, não é coluna
+    }
+
+    @classmethod
+    def colunas(cls, campos):
+        colunas = {'id', 'publicado_em'}  # sempre lidas: chave da paginação por cursor
+        for campo in campos:
+            colunas.update(cls.COLUNAS.get(campo, [campo]))
+        return sorted(colunas)
+
+    def get_miniaturas(self, obj):
+        # Cópias locais redimensionadas da imagem ({"320": {"webp": url, "jpeg": url}})
+        return urls_miniaturas(obj, self.context.get('request'))
+
+    def get_total_duplicatas(self, obj):
+        # Só vem preenchido na listagem com ?agrupar=true
+        return getattr(obj, 'total_duplicatas', None)
@@ -0,0 +1,52 @@
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .cache import invalidar_cache_api
+from .categorias import atualizar_fontes_ativas, descontar_noticias_da_fonte, somar_noticias
+from .models import Fonte, Noticia
+
+# Campos da Fonte que aparecem nas respostas da API (nome/categoria) ou mudam a listagem
+CAMPOS_PUBLICOS_FONTE = {'nome', 'categoria_padrao', 'ativo'}
+
+
+@receiver(post_save, sender=Noticia)
+def noticia_salva(sender, instance, created=False, **kwargs):
+    if created:
+        somar_noticias(instance.categoria, 1, instance.publicado_em)
+    invalidar_cache_api()
+
+
+def _apagando_fonte(origin):
+    modelo = origin.model if isinstance(origin, QuerySet) else type(origin)
+    return modelo is Fonte
+
+
+@receiver(post_delete, sender=Noticia)
+def noticia_removida(sender, instance, origin=None, **kwargs):
+    # Na cascata de uma Fonte o índice já foi ajustado em lote (fonte_sendo_removida)
+    if _apagando_fonte(origin):
+        return
+    somar_noticias(instance.categoria, -1)
+    invalidar_cache_api()
+
+
+@receiver(pre_delete, sender=Fonte)
+def fonte_sendo_removida(sender, instance, **kwargs):
+    # Roda na mesma transação do DELETE; o cache é invalidado uma vez, no post_delete da Fonte
+    descontar_noticias_da_fonte(instance)
+
+
+@receiver(post_save, sender=Fonte)
+def invalidar_cache_fonte_salva(sender, update_fields=None, **kwargs):
+    # As coletas salvam a fonte a todo momento (agendamento, validadores HTTP): essas não contam
+    if update_fields is not None and not CAMPOS_PUBLICOS_FONTE & set(update_fields):
+        return
+    atualizar_fontes_ativas()
+    invalidar_cache_api()
+
+
+@receiver(post_delete, sender=Fonte)
+def invalidar_cache_fonte_removida(sender, **kwargs):
+    atualizar_fontes_ativas()
+    invalidar_cache_api()
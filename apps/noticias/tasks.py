@@ -1,57 +1,29 @@
 import feedparser
+import logging
 from datetime import datetime
 from django.utils.timezone import make_aware
-from celery import shared_task
-from .models import Fonte, Noticia
-import requests
-from bs4 import BeautifulSoup
+from celery import chord, shared_task
+from celery.schedules import crontab
+from . import circuito
+from .models import Fonte, ImportRun, Noticia
+from .arquivamento import arquivar_noticias
+from .agendamento import registrar_coleta, reservar_fontes_devidas
+from .aquecimento import aquecer_cache_api
+from .duplicatas import calcular_impressao, marcar_duplicatas
+from .execucoes import (
+    encerrar_execucoes_travadas, finalizar_execucao, iniciar_execucao, podar_execucoes, recalcular_totais,
+    registrar_fonte, registrar_raspagem,
+)
+from .feeds import resultado_com_erro, baixar_feed_da_fonte, salvar_validadores
+from .imagens import gerar_miniaturas
+from .ingestao import atualizar_marca_dagua, data_publicacao, filtrar_entradas_novas, persistir_noticias
+from .scraping import extrair_conteudo_completo_web, raspar_noticias  # noqa: F401 - mantida importável daqui
+from django.conf import settings
+from django.db import transaction
 import time
 
+logger = logging.getLogger(__name__)
 
-def extrair_conteudo_completo_web(url, timeout=10):
-    """Extrai conteúdo completo fazendo scraping da página original"""
-    try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        
-        response = requests.get(url, headers=headers, timeout=timeout)
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Tentar diferentes seletores comuns para artigos
-        content_selectors = [
-            'article',
-            '.post-content',
-            '.entry-content', 
-            '.article-content',
-            '.content',
-            '[class*="content"]',
-            'main',
-        ]
-        
-        content = None
-        for selector in content_selectors:
-            elements = soup.select(selector)
-            if elements:
-                content = elements[0]
-                break
-        
-        if content:
-            # Remover elementos indesejados
-            for unwanted in content.select('script, style, nav, footer, aside, .ads, .advertisement'):
-                unwanted.decompose()
-            
-            # Extrair texto mantendo parágrafos
-            paragraphs = content.find_all(['p', 'div', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6'])
-            text_content = '\n\n'.join([p.get_text().strip() for p in paragraphs if p.get_text().strip()])
-            
-            return text_content[:15000] if text_content else None
-            
-    except Exception as e:
-        print(f"Erro no web scraping para {url}: {e}")
-        return None
 
 def extrair_imagem_feed(entry):
     """Extrai URL da imagem de diferentes fontes do feed RSS"""
@@ -106,72 +78,362 @@ def extrair_imagem_feed(entry):
     
     return imagem_url
 
+def importar_entradas(fonte, feed):
+    """
+    Cria as notícias de um feed já parseado.
+
+    Só as entradas acima da marca d'água da fonte são processadas (ver
+    filtrar_entradas_novas). Retorna as contagens de `persistir_noticias`
+    (criadas/ignoradas/ids) mais `vistas` e `puladas` pela marca d'água.
+    """
+    entries = filtrar_entradas_novas(fonte, feed.entries)
+    noticias = []
+    datadas = []
+    for entry in entries:
+        link = entry.link
+        titulo = entry.title
+        resumo = getattr(entry, 'summary', '')[:1000]
+        
+        # NOVO: Extrair conteúdo completo
+        conteudo_completo = ''
+        if hasattr(entry, 'content') and entry.content:
+            conteudo_completo = entry.content[0].value if isinstance(entry.content, list) else entry.content
+        elif hasattr(entry, 'description') and entry.description:
+            conteudo_completo = entry.description
+        elif resumo:
+            conteudo_completo = resumo
+
+        # Conteúdo vazio ou muito pequeno é completado depois, por raspar_conteudo_task
+
+        # Limitar tamanho
+        if conteudo_completo:
+            conteudo_completo = conteudo_completo[:15000]
+
+        # NOVO: Extrair imagem
+        imagem_url = extrair_imagem_feed(entry)
+
+        data_feed = data_publicacao(entry)
+        publicado_em = data_feed or make_aware(datetime.now())
+
+        noticia = Noticia(
+            fonte=fonte,
+            link=link,
+            titulo=titulo,
+            resumo=resumo,
+            conteudo_completo=conteudo_completo,
+            categoria=fonte.categoria_padrao,
+            imagem=imagem_url,
+            publicado_em=publicado_em,
+        )
+        calcular_impressao(noticia)
+        noticias.append(noticia)
+        if data_feed:
+            datadas.append(noticia)
+
+    contagens = persistir_noticias(fonte, noticias)
+    # Só datas vindas do feed valem como marca d'água (não o "agora" do fallback)
+    atualizar_marca_dagua(fonte, datadas)
+    contagens['vistas'] = len(feed.entries)
+    contagens['puladas'] = len(feed.entries) - len(entries)
+    return contagens
+
+
 # Task para importar notícias automaticamente
 @shared_task
-def importar_noticias_task():
-    fontes = Fonte.objects.filter(ativo=True)
-    total_importadas = 0
+def importar_noticias_task(fonte_ids=None, import_run_id=None, incluir_inativas=False):
+    """
+    Importa as fontes informadas (ou todas as ativas, se `fonte_ids` for None).
+
+    Fontes inativas ficam de fora, a não ser com `incluir_inativas` (a ação
+    do admin importa exatamente as fontes selecionadas).
+
+    No agendamento adaptativo quem chama é despachar_coletas_task, só com as
+    fontes cuja próxima coleta já venceu; a ação do admin passa também a
+    ImportRun que criou. Cada fonte vira uma importar_fonte_task (um chord),
+    e finalizar_importacao_task fecha a ImportRun quando todas terminam e
+    dispara as etapas seguintes (ver processar_novidades).
+    """
+    fontes = Fonte.objects.order_by('id')
+    if not incluir_inativas:
+        fontes = fontes.filter(ativo=True)
+    if fonte_ids is not None:
+        fontes = fontes.filter(id__in=fonte_ids)
+    fontes, bloqueadas = separar_circuitos_abertos(fontes)
+    execucao = iniciar_execucao(import_run_id, len(fontes), importar_noticias_task.request.id or '')
 
+    if fontes:
+        # Se alguma tarefa do chord falhar de vez, o callback não roda: o errback fecha a execução
+        chord(importar_fonte_task.s(fonte.id, execucao.pk, incluir_inativas) for fonte in fontes)(
+            finalizar_importacao_task.s(execucao.pk, bloqueadas).on_error(falhar_importacao_task.s(execucao.pk))
+        )
+    else:
+        # chord vazio não chama o callback
+        finalizar_importacao_task([], execucao.pk, bloqueadas)
+
+    logger.info(f'{len(fontes)} fontes despachadas para importação (execução {execucao.pk})')
+    return {'import_run_id': execucao.pk, 'fontes': len(fontes), 'circuito_aberto': bloqueadas}
+
+
+def separar_circuitos_abertos(fontes):
+    """Tira da coleta as fontes com circuito aberto; devolve (fontes, ids das bloqueadas)."""
+    liberadas, bloqueadas = [], []
     for fonte in fontes:
-        feed = feedparser.parse(fonte.feed_url)
-        count = 0
-        for entry in feed.entries:
-            link = entry.link
-            titulo = entry.title
-            resumo = getattr(entry, 'summary', '')[:1000]
-            
-            # NOVO: Extrair conteúdo completo
-            conteudo_completo = ''
-            if hasattr(entry, 'content') and entry.content:
-                conteudo_completo = entry.content[0].value if isinstance(entry.content, list) else entry.content
-            elif hasattr(entry, 'description') and entry.description:
-                conteudo_completo = entry.description
-            elif resumo:
-                conteudo_completo = resumo
-
-            # Se conteúdo ainda está vazio ou muito pequeno, tentar web scraping
-            if not conteudo_completo or len(conteudo_completo.strip()) < 200:
-                print(f"Tentando web scraping para: {titulo}")
-                scraped_content = extrair_conteudo_completo_web(link)
-                if scraped_content:
-                    conteudo_completo = scraped_content
-
-            # Limitar tamanho
-            if conteudo_completo:
-                conteudo_completo = conteudo_completo[:15000]
-
-            # NOVO: Extrair imagem
-            imagem_url = extrair_imagem_feed(entry)
-
-            if hasattr(entry, 'published_parsed'):
-                publicado_em = make_aware(datetime(*entry.published_parsed[:6]))
-            else:
-                publicado_em = make_aware(datetime.now())
-
-            noticia, created = Noticia.objects.get_or_create(
-                fonte=fonte,
-                link=link,
-                defaults={
-                    'titulo': titulo,
-                    'resumo': resumo,
-                    'conteudo_completo': conteudo_completo,  # NOVO CAMPO
-                    'categoria': fonte.categoria_padrao,     # NOVO CAMPO
-                    'imagem': imagem_url,                    # NOVO CAMPO
-                    'publicado_em': publicado_em,
-                }
-            )
-            if created:
-                count += 1
-        total_importadas += count
-        print(f'{count} notícias importadas da fonte "{fonte.nome}"')
-
-    print(f'Total de notícias importadas: {total_importadas}')
-
-
-# Agendamento Celery Beat
+        if circuito.estado(fonte.falhas_consecutivas, fonte.circuito_aberto_ate) == circuito.ABERTO:
+            bloqueadas.append(fonte.id)
+        else:
+            liberadas.append(fonte)
+    if bloqueadas:
+        logger.info(f'{len(bloqueadas)} fontes com circuito aberto ficaram fora da coleta')
+    return liberadas, bloqueadas
+
+
+@shared_task(
+    bind=True,
+    max_retries=settings.NOTICIAS_IMPORTACAO_TENTATIVAS,
+    acks_late=True,
+    reject_on_worker_lost=True,
+)
+def importar_fonte_task(self, fonte_id, import_run_id=None, incluir_inativas=False):
+    """
+    Baixa e importa o feed de uma fonte.
+
+    Pode rodar de novo sem duplicar nada: a gravação das notícias e da
+    telemetria é uma transação só, então uma tentativa que falhou não deixa
+    notícias sem raspagem nem contagens pela metade. Uma exceção
+    vira nova tentativa com recuo; esgotadas as tentativas, a falha é
+    registrada e devolvida como resumo, para o chord terminar mesmo assim.
+    """
+    try:
+        return importar_fonte(fonte_id, import_run_id, incluir_inativas)
+    except Exception as exc:
+        if self.request.retries < self.max_retries:
+            raise self.retry(exc=exc, countdown=settings.NOTICIAS_IMPORTACAO_RECUO_RETRY * 2 ** self.request.retries)
+        logger.exception(f'Importação da fonte {fonte_id} falhou após {self.request.retries} novas tentativas')
+        return registrar_falha_fonte(fonte_id, import_run_id, repr(exc))
+
+
+def importar_fonte(fonte_id, import_run_id=None, incluir_inativas=False):
+    """Importa uma fonte e devolve o resumo usado por finalizar_importacao_task."""
+    fontes = Fonte.objects.all() if incluir_inativas else Fonte.objects.filter(ativo=True)
+    fonte = fontes.filter(pk=fonte_id).first()
+    if fonte is None:
+        return {'fonte_id': fonte_id, 'fonte': None, 'criadas': 0, 'ignoradas': 0, 'ids': [], 'latencia': None,
+                'erro': 'fonte inexistente ou inativa', 'nao_modificado': False}
+
+    resultado = baixar_feed_da_fonte(fonte)
+    latencia = resultado['latencia']
+    resumo = {
+        'fonte_id': fonte.id,
+        'fonte': fonte.nome,
+        'criadas': 0,
+        'ignoradas': 0,
+        'ids': [],
+        'latencia': round(latencia, 3) if latencia is not None else None,
+        'erro': resultado['erro'],
+        'nao_modificado': resultado['nao_modificado'],
+    }
+    if resultado['erro']:
+        logger.warning(f'Falha ao baixar feed da fonte "{fonte.nome}": {resultado["erro"]}')
+        registrar_coleta(fonte, sucesso=False, erro=resultado['erro'])
+        registrar_fonte(import_run_id, fonte, resultado)
+        return resumo
+
+    if resultado['nao_modificado']:
+        logger.info(f'Feed da fonte "{fonte.nome}" não mudou desde a última importação')
+        salvar_validadores(fonte, resultado)
+        registrar_coleta(fonte, sucesso=True)
+        registrar_fonte(import_run_id, fonte, resultado)
+        return resumo
+
+    inicio_parse = time.monotonic()
+    feed = feedparser.parse(resultado['conteudo'], response_headers=resultado['headers'])
+    inicio_persistencia = time.monotonic()
+    # Inserção, marca d'água, validadores e telemetria entram juntos ou não entram: se algo falhar
+    # depois do insert, a nova tentativa grava de novo as mesmas notícias e devolve os ids delas
+    with transaction.atomic():
+        contagens = importar_entradas(fonte, feed)
+        fim = time.monotonic()
+        salvar_validadores(fonte, resultado)
+        registrar_coleta(fonte, sucesso=True, criadas=contagens['criadas'], feed=feed)
+        registro = registrar_fonte(
+            import_run_id, fonte, resultado, contagens,
+            tempo_parse=inicio_persistencia - inicio_parse,
+            tempo_persistencia=fim - inicio_persistencia,
+        )
+    logger.info(
+        f'{contagens["criadas"]} notícias importadas da fonte "{fonte.nome}" '
+        f'({contagens["ignoradas"]} já existentes, {contagens["puladas"]} abaixo da marca d\'água, '
+        f'download em {resultado["latencia"]:.2f}s)'
+    )
+    resumo['criadas'] = contagens['criadas']
+    resumo['ignoradas'] = contagens['ignoradas']
+    # Raspagem e miniaturas saem do callback do chord, junto com as das outras fontes
+    resumo['ids'] = contagens['ids']
+    resumo['execucao_fonte_id'] = registro.pk
+    return resumo
+
+
+def registrar_falha_fonte(fonte_id, import_run_id, erro):
+    """Registra como falha de coleta uma fonte que esgotou as novas tentativas."""
+    fonte = Fonte.objects.filter(pk=fonte_id).first()
+    if fonte is not None:
+        registrar_coleta(fonte, sucesso=False, erro=erro)
+        registrar_fonte(import_run_id, fonte, resultado_com_erro(erro, None))
+    return {'fonte_id': fonte_id, 'fonte': fonte.nome if fonte else None, 'criadas': 0, 'ignoradas': 0, 'ids': [],
+            'latencia': None, 'erro': erro, 'nao_modificado': False}
+
+
+@shared_task
+def finalizar_importacao_task(resumos, import_run_id, circuito_aberto=()):
+    """Callback do chord: totaliza as fontes, fecha a ImportRun e dispara as etapas das notícias novas."""
+    execucao = ImportRun.objects.get(pk=import_run_id)
+    totais = recalcular_totais(import_run_id)
+    finalizar_execucao(execucao)
+    processar_novidades(resumos)
+
+    duracao = (execucao.finalizado_em - execucao.iniciado_em).total_seconds() if execucao.iniciado_em else 0
+    logger.info(f'Total de notícias importadas: {totais["criadas"]} em {duracao:.2f}s')
+    return {
+        'import_run_id': import_run_id,
+        'total_importadas': totais['criadas'],
+        'total_ignoradas': totais['ignoradas'],
+        'tempo_total': round(duracao, 3),
+        'feeds': resumos,
+        'circuito_aberto': list(circuito_aberto),
+    }
+
+
+@shared_task
+def falhar_importacao_task(request, exc, traceback, import_run_id):
+    """Errback do chord: fecha como falha a execução cujo callback não vai rodar."""
+    execucao = ImportRun.objects.get(pk=import_run_id)
+    if execucao.status not in ImportRun.EM_ANDAMENTO:
+        return
+    recalcular_totais(import_run_id)
+    finalizar_execucao(execucao, erro=repr(exc))
+    logger.error(f'Importação {import_run_id} encerrada com falha: {exc!r}')
+    # Sem os resumos do chord: as notícias que as fontes gravaram na execução saem do banco
+    resumos = []
+    for registro in execucao.fontes.filter(criadas__gt=0, fonte__isnull=False):
+        ids = list(
+            Noticia.objects.filter(fonte_id=registro.fonte_id, criado_em__gte=execucao.iniciado_em)
+            .values_list('id', flat=True)
+        )
+        resumos.append({'ids': ids, 'execucao_fonte_id': registro.pk})
+    processar_novidades(resumos)
+
+
+def processar_novidades(resumos):
+    """
+    Raspa o conteúdo e gera as miniaturas das notícias criadas na execução
+    e, quando todas essas tarefas terminam, aquece o cache da API.
+
+    As etapas trocam a versão do cache ao gravar: aquecer antes delas
+    jogaria fora as respostas recém-aquecidas.
+    """
+    etapas = []
+    for resumo in resumos:
+        if resumo.get('ids'):
+            etapas.append(raspar_conteudo_task.s(resumo['ids'], execucao_fonte_id=resumo.get('execucao_fonte_id')))
+            etapas.append(gerar_miniaturas_task.s(resumo['ids']))
+    if etapas:
+        chord(etapas)(aquecer_cache_api_task.si())
+    return len(etapas)
+
+
+@shared_task
+def raspar_conteudo_task(noticia_ids, execucao_fonte_id=None):
+    """
+    Etapa de scraping: completa o conteúdo das notícias recém-inseridas e,
+    com o texto já definitivo, liga as quase-duplicatas de outras fontes.
+
+    O custo da raspagem é somado à ImportRunFonte que originou as notícias.
+    """
+    inicio = time.monotonic()
+    resultado = raspar_noticias(noticia_ids)
+    if execucao_fonte_id:
+        registrar_raspagem(execucao_fonte_id, resultado['tentativas'], resultado['atualizadas'], time.monotonic() - inicio)
+    resultado['duplicatas'] = marcar_duplicatas(noticia_ids)
+    if resultado['pendentes']:
+        # O circuito de algum domínio fechou: raspa o que ficou para trás enquanto estava aberto
+        raspar_conteudo_task.delay(resultado['pendentes'])
+    logger.info(
+        f'Scraping: {resultado["atualizadas"]}/{resultado["tentativas"]} notícias completadas, '
+        f'{resultado["bloqueadas"]} puladas por circuito aberto, {len(resultado["pendentes"])} reenfileiradas, '
+        f'{resultado["duplicatas"]} duplicatas encontradas em {time.monotonic() - inicio:.2f}s'
+    )
+    return resultado
+
+
+@shared_task
+def aquecer_cache_api_task():
+    """
+    Pré-carrega no cache as respostas mais pedidas da API (ver aquecimento.py).
+
+    Roda uma vez por execução de importação com novidades, depois da
+    raspagem e das miniaturas (ver processar_novidades), quando a versão do
+    cache já não vai mudar, para o primeiro visitante não pagar a consulta.
+    """
+    aquecidas = aquecer_cache_api()
+    logger.info(f'Cache da API aquecido: {aquecidas} respostas')
+    return aquecidas
+
+
+@shared_task
+def despachar_coletas_task():
+    """
+    Tick do agendamento adaptativo: despacha só as fontes com coleta vencida.
+
+    Roda a cada minuto pelo django_celery_beat (ver o comando
+    configurar_agendamento_noticias); cada fonte tem seu próprio intervalo.
+    """
+    encerrar_execucoes_travadas()
+    fonte_ids = reservar_fontes_devidas()
+    if fonte_ids:
+        importar_noticias_task.delay(fonte_ids=fonte_ids)
+        logger.info(f'{len(fonte_ids)} fontes despachadas para coleta')
+    return fonte_ids
+
+
+@shared_task
+def gerar_miniaturas_task(noticia_ids):
+    """Baixa uma vez a imagem das notícias novas e gera as miniaturas locais."""
+    inicio = time.monotonic()
+    resultado = gerar_miniaturas(noticia_ids)
+    logger.info(
+        f'Miniaturas: {resultado["processadas"]}/{resultado["tentativas"]} imagens processadas '
+        f'em {time.monotonic() - inicio:.2f}s'
+    )
+    return resultado
+
+
+@shared_task
+def arquivar_noticias_task(meses=None):
+    """
+    Retenção diária: move para o arquivo as notícias além de
+    NOTICIAS_RETENCAO_MESES e apaga a telemetria de importação além de
+    NOTICIAS_EXECUCOES_RETENCAO_DIAS.
+    """
+    inicio = time.monotonic()
+    resultado = arquivar_noticias(meses)
+    if resultado['arquivadas']:
+        aquecer_cache_api_task.delay()
+    resultado['execucoes_removidas'] = podar_execucoes()
+    logger.info(
+        f'Retenção: {resultado["arquivadas"]} notícias arquivadas e {resultado["execucoes_removidas"]} '
+        f'execuções de importação apagadas em {time.monotonic() - inicio:.2f}s'
+    )
+    return resultado
+
+
+# Agendamento Celery Beat (equivalente aos PeriodicTask criados por configurar_agendamento_noticias)
 CELERY_BEAT_SCHEDULE = {
-    'importar-noticias-a-cada-30-minutos': {
-        'task': 'apps.noticias.tasks.importar_noticias_task',
-        'schedule': 30 * 60.0,  # 30 minutos
+    'despachar-coletas-de-noticias': {
+        'task': 'apps.noticias.tasks.despachar_coletas_task',
+        'schedule': 60.0,  # 1 minuto; o intervalo real é de cada fonte
+    },
+    'arquivar-noticias-antigas': {
+        'task': 'apps.noticias.tasks.arquivar_noticias_task',
+        'schedule': crontab(hour=3, minute=30),
     },
-}
\ No newline at end of file
+}
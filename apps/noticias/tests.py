@@ -1,3 +1,226 @@
-from django.test import TestCase
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
 
-# Create your tests here.
+from django.test import SimpleTestCase, override_settings
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from . import campos, circuito, duplicatas
+from .cache import invalidar_cache_api, parametros_normalizados, versao_atual
+from .canonicalizacao import canonicalizar_url, hash_url
+from .ingestao import limitar_campos
+from .models import Noticia
+from .paginacao import KeysetPagination
+
+CACHE_LOCAL = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'noticias-testes'}}
+
+
+class SimHashTests(SimpleTestCase):
+    texto = (
+        'A Receita Federal prorrogou o prazo de entrega da declaração do imposto de renda '
+        'para contribuintes afetados pelas enchentes no Rio Grande do Sul'
+    )
+
+    def test_textos_iguais_geram_a_mesma_impressao(self):
+        self.assertEqual(duplicatas.simhash(self.texto), duplicatas.simhash(self.texto))
+
+    def test_ignora_html_maiusculas_e_acentos(self):
+        variante = f'<p>{self.texto.upper()}</p>'.replace('DECLARAÇÃO', 'declaracao')
+        self.assertEqual(duplicatas.simhash(self.texto), duplicatas.simhash(variante))
+
+    def test_texto_quase_igual_fica_perto_e_texto_diferente_longe(self):
+        original = duplicatas.simhash(self.texto)
+        quase = duplicatas.simhash(self.texto + ' nesta semana')
+        outro = duplicatas.simhash('Banco Central mantém a taxa de juros e sinaliza cortes no próximo semestre')
+        self.assertLess(duplicatas.distancia(original, quase), duplicatas.distancia(original, outro))
+
+    def test_impressao_cabe_em_bigint(self):
+        impressao = duplicatas.simhash(self.texto)
+        self.assertGreaterEqual(impressao, -(1 << 63))
+        self.assertLess(impressao, 1 << 63)
+
+    def test_texto_vazio(self):
+        self.assertIsNone(duplicatas.simhash(''))
+        self.assertIsNone(duplicatas.simhash('<p></p>'))
+
+    def test_distancia(self):
+        self.assertEqual(duplicatas.distancia(0, 0), 0)
+        self.assertEqual(duplicatas.distancia(0b1011, 0b0001), 2)
+        self.assertEqual(duplicatas.distancia(-1, 0), 64)
+
+
+class BandasTests(SimpleTestCase):
+    def test_quatro_faixas_marcadas_com_o_indice(self):
+        faixas = duplicatas.bandas(0x0004_0003_0002_0001)
+        self.assertEqual(faixas, [1, 1 << 16 | 2, 2 << 16 | 3, 3 << 16 | 4])
+
+    def test_impressao_negativa_usa_os_bits_sem_sinal(self):
+        self.assertEqual(duplicatas.bandas(-1), [indice << 16 | 0xFFFF for indice in range(4)])
+
+    def test_ate_tres_bits_de_diferenca_compartilham_uma_faixa(self):
+        impressao = 0x1234_5678_9ABC_DEF0
+        vizinha = impressao ^ (1 << 3) ^ (1 << 20) ^ (1 << 40)
+        self.assertTrue(set(duplicatas.bandas(impressao)) & set(duplicatas.bandas(vizinha)))
+
+
+class CalcularImpressaoTests(SimpleTestCase):
+    def test_usa_o_resumo_quando_nao_ha_conteudo(self):
+        noticia = SimpleNamespace(titulo='Título', conteudo_completo=None, resumo='Resumo da notícia')
+        duplicatas.calcular_impressao(noticia)
+        self.assertEqual(noticia.simhash, duplicatas.simhash('Título Resumo da notícia'))
+        self.assertEqual(noticia.simhash_bandas, duplicatas.bandas(noticia.simhash))
+
+
+class CursorTests(SimpleTestCase):
+    def test_ida_e_volta(self):
+        paginacao = KeysetPagination()
+        item = SimpleNamespace(publicado_em=datetime(2026, 3, 1, 12, 30, tzinfo=timezone.utc), pk=42)
+        self.assertEqual(paginacao.decode_cursor(paginacao.encode_cursor(item)), (item.publicado_em, 42))
+
+    def test_cursor_invalido(self):
+        paginacao = KeysetPagination()
+        for cursor in ('nao-e-base64!', 'YWJj', ''):
+            with self.subTest(cursor=cursor), self.assertRaises(NotFound):
+                paginacao.decode_cursor(cursor)
+
+
+class TextoCompactadoTests(SimpleTestCase):
+    longo = 'Notícia com acentuação e texto repetido. ' * 50
+
+    def test_ida_e_volta_zlib(self):
+        valor = campos.compactar_texto(self.longo, campos.FORMATO_ZLIB)
+        self.assertEqual(valor[:1], campos.FORMATO_ZLIB)
+        self.assertLess(len(valor), len(self.longo.encode()))
+        self.assertEqual(campos.descompactar_texto(valor), self.longo)
+
+    def test_ida_e_volta_zstd(self):
+        if campos.zstandard is None:
+            self.skipTest('zstandard não instalado')
+        valor = campos.compactar_texto(self.longo, campos.FORMATO_ZSTD)
+        self.assertEqual(valor[:1], campos.FORMATO_ZSTD)
+        self.assertEqual(campos.descompactar_texto(valor), self.longo)
+
+    def test_texto_curto_fica_sem_compactar(self):
+        valor = campos.compactar_texto('curto')
+        self.assertEqual(valor, campos.FORMATO_TEXTO + b'curto')
+        self.assertEqual(campos.descompactar_texto(memoryview(valor)), 'curto')
+
+    def test_formato_desconhecido(self):
+        with self.assertRaises(ValueError):
+            campos.descompactar_texto(b'\x09abc')
+
+    def test_campo_converte_na_leitura(self):
+        campo = campos.TextoCompactadoField()
+        self.assertEqual(campo.from_db_value(campos.compactar_texto(self.longo), None, None), self.longo)
+        self.assertIsNone(campo.from_db_value(None, None, None))
+        self.assertEqual(campo.to_python(campos.compactar_texto('abc')), 'abc')
+        self.assertEqual(campo.to_python('abc'), 'abc')
+
+
+class ParametrosNormalizadosTests(SimpleTestCase):
+    def parametros(self, query):
+        return parametros_normalizados(Request(APIRequestFactory().get(f'/api/noticias/?{query}')))
+
+    def test_ordem_e_valores_vazios_nao_importam(self):
+        self.assertEqual(self.parametros('categoria=b&search=x'), self.parametros('search=x&categoria=b&ordering='))
+
+    def test_primeira_pagina_e_format_sao_ignorados(self):
+        self.assertEqual(self.parametros('page=1&format=json&categoria=a'), 'categoria=a')
+        self.assertEqual(self.parametros('page=2'), 'page=2')
+
+
+@override_settings(CACHES=CACHE_LOCAL)
+class VersaoCacheTests(SimpleTestCase):
+    def test_invalidar_troca_a_versao(self):
+        antes = versao_atual()
+        invalidar_cache_api()
+        self.assertEqual(versao_atual(), antes + 1)
+
+
+@override_settings(NOTICIAS_CIRCUITO_FALHAS=3, NOTICIAS_CIRCUITO_RECUO_INICIAL=60, NOTICIAS_CIRCUITO_RECUO_MAXIMO=600)
+class CircuitoTests(SimpleTestCase):
+    agora = datetime(2026, 5, 1, 12, tzinfo=timezone.utc)
+
+    def test_estado(self):
+        depois = self.agora + timedelta(minutes=1)
+        self.assertEqual(circuito.estado(0, None, self.agora), circuito.FECHADO)
+        self.assertEqual(circuito.estado(2, depois, self.agora), circuito.FECHADO)
+        self.assertEqual(circuito.estado(3, None, self.agora), circuito.FECHADO)
+        self.assertEqual(circuito.estado(3, depois, self.agora), circuito.ABERTO)
+        self.assertEqual(circuito.estado(3, self.agora, self.agora), circuito.SONDA)
+
+    def test_abre_no_limite_com_o_recuo_inicial(self):
+        falhas, aberto_ate = 0, None
+        for _ in range(2):
+            falhas, aberto_ate = circuito.registrar(falhas, sucesso=False, agora=self.agora)
+            self.assertIsNone(aberto_ate)
+        falhas, aberto_ate = circuito.registrar(falhas, sucesso=False, agora=self.agora)
+        self.assertEqual(falhas, 3)
+        self.assertEqual(aberto_ate, self.agora + timedelta(seconds=60))
+
+    def test_recuo_dobra_a_cada_sonda_ate_o_maximo(self):
+        esperados = [120, 240, 480, 600, 600]
+        for falhas, segundos in enumerate(esperados, start=4):
+            with self.subTest(falhas=falhas):
+                self.assertEqual(circuito.aberto_ate(falhas, self.agora), self.agora + timedelta(seconds=segundos))
+
+    def test_sucesso_fecha(self):
+        self.assertEqual(circuito.registrar(7, sucesso=True, agora=self.agora), (0, None))
+
+
+class CanonicalizacaoTests(SimpleTestCase):
+    def test_remove_parametros_de_rastreamento(self):
+        self.assertEqual(
+            canonicalizar_url('https://g1.globo.com/a.html?utm_source=tw&UTM_Medium=x&fbclid=abc&id=7'),
+            'https://g1.globo.com/a.html?id=7',
+        )
+        self.assertEqual(canonicalizar_url('https://g1.globo.com/a.html?utm_campaign=y'), 'https://g1.globo.com/a.html')
+
+    def test_porta_padrao_sai_e_as_outras_ficam(self):
+        self.assertEqual(canonicalizar_url('https://exemplo.com.br:443/n'), 'https://exemplo.com.br/n')
+        self.assertEqual(canonicalizar_url('http://exemplo.com.br:80/n'), 'https://exemplo.com.br/n')
+        self.assertEqual(canonicalizar_url('https://exemplo.com.br:8443/n'), 'https://exemplo.com.br:8443/n')
+
+    def test_remove_fragmento(self):
+        self.assertEqual(canonicalizar_url('https://exemplo.com.br/n?id=1#comentarios'), 'https://exemplo.com.br/n?id=1')
+
+    def test_http_vira_https(self):
+        self.assertEqual(canonicalizar_url('http://exemplo.com.br/n'), 'https://exemplo.com.br/n')
+
+    def test_host_em_minusculas_e_caminho_como_veio(self):
+        self.assertEqual(canonicalizar_url('HTTPS://Exemplo.COM.br/Noticia/'), 'https://exemplo.com.br/Noticia/')
+        self.assertEqual(canonicalizar_url('https://exemplo.com.br'), 'https://exemplo.com.br/')
+
+    def test_parametros_em_ordem(self):
+        self.assertEqual(canonicalizar_url('https://exemplo.com.br/n?b=2&a=1'), 'https://exemplo.com.br/n?a=1&b=2')
+
+    def test_hash_igual_para_variantes_e_cabe_em_bigint(self):
+        original = hash_url('https://exemplo.com.br/n?id=1')
+        self.assertEqual(hash_url('http://Exemplo.com.br:80/n?utm_source=x&id=1#topo'), original)
+        self.assertNotEqual(hash_url('https://exemplo.com.br/n?id=2'), original)
+        self.assertGreaterEqual(original, -(1 << 63))
+        self.assertLess(original, 1 << 63)
+
+
+class LimitarCamposTests(SimpleTestCase):
+    fonte = SimpleNamespace(nome='Fonte de teste')
+
+    def test_corta_titulo_e_descarta_imagem_longa(self):
+        noticia = Noticia(
+            titulo='T' * 300, link='https://exemplo.com.br/n', imagem='https://exemplo.com.br/' + 'i' * 300
+        )
+        self.assertTrue(limitar_campos(self.fonte, noticia))
+        self.assertEqual(noticia.titulo, 'T' * 255)
+        self.assertIsNone(noticia.imagem)
+
+    def test_mantem_valores_que_cabem(self):
+        noticia = Noticia(titulo='Título', link='https://exemplo.com.br/n', imagem='https://exemplo.com.br/i.jpg')
+        self.assertTrue(limitar_campos(self.fonte, noticia))
+        self.assertEqual(noticia.titulo, 'Título')
+        self.assertEqual(noticia.imagem, 'https://exemplo.com.br/i.jpg')
+
+    def test_ignora_link_vazio_ou_longo(self):
+        for link in ('', 'https://exemplo.com.br/' + 'l' * 300):
+            with self.subTest(link=link[:30]), self.assertLogs('apps.noticias.ingestao', 'WARNING'):
+                self.assertFalse(limitar_campos(self.fonte, Noticia(titulo='T', link=link)))
@@ -1,8 +1,9 @@
 from django.urls import path
-from .views import NoticiasListView, NoticiaDetailView, CategoriasListView
+from .views import NoticiasListView, NoticiaDetailView, CategoriasListView, EstatisticasImportacaoView
 
 urlpatterns = [
     path('noticias/', NoticiasListView.as_view(), name='noticias-list'),
     path('noticias/<int:pk>/', NoticiaDetailView.as_view(), name='noticia-detail'),
     path('categorias/', CategoriasListView.as_view(), name='categorias-list'),  # NOVA URL
+    path('noticias/estatisticas/importacao/', EstatisticasImportacaoView.as_view(), name='noticias-estatisticas-importacao'),
 ]
\ No newline at end of file
@@ -1,49 +1,120 @@
 from rest_framework import generics, filters
-from rest_framework.permissions import AllowAny
+from datetime import timedelta
+from django.utils import timezone
+from rest_framework.permissions import AllowAny, IsAdminUser
+from rest_framework.views import APIView
 from rest_framework.response import Response
-from django.db.models import Q
-from .models import Noticia, Fonte
+from django.db.models import Count, Q
+from .models import Noticia
+from .busca import BuscaTextoCompletoFilter
+from .cache import ETagMixin, RespostaCacheadaMixin
+from .categorias import listar_categorias
+from .execucoes import estatisticas_execucoes, estatisticas_por_fonte
+from .paginacao import PaginacaoNoticias
 from .serializers import NoticiaSerializer
 from django_filters.rest_framework import DjangoFilterBackend
 
-class NoticiasListView(generics.ListAPIView):
+class CamposEsparsosMixin:
+    """
+    ?fields=titulo,link e ?omit=resumo para escolher os campos da resposta.
+
+    Além de enxugar o serializer, a escolha vai para o queryset com .only(),
+    então colunas grandes como conteudo_completo nem saem do Postgres.
+    Sem ?fields=, vale `campos_padrao` (ou todos os campos do serializer).
+    """
+    campos_padrao = None
+
+    def _lista_parametro(self, nome):
+        valor = self.request.query_params.get(nome, '')
+        return [campo.strip() for campo in valor.split(',') if campo.strip()]
+
+    def campos_pedidos(self):
+        disponiveis = self.get_serializer_class().Meta.fields
+        campos = self._lista_parametro('fields') or self.campos_padrao or disponiveis
+        omitidos = set(self._lista_parametro('omit'))
+        return [campo for campo in campos if campo in disponiveis and campo not in omitidos]
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        campos = self.campos_pedidos()
+        if 'fonte' in campos:
+            queryset = queryset.select_related('fonte')
+        return queryset.only(*self.get_serializer_class().colunas(campos))
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs.setdefault('fields', self.campos_pedidos())
+        return super().get_serializer(*args, **kwargs)
+
+
+class NoticiasListView(ETagMixin, RespostaCacheadaMixin, CamposEsparsosMixin, generics.ListAPIView):
     queryset = Noticia.objects.all().order_by('-publicado_em')
     serializer_class = NoticiaSerializer
+    campos_padrao = NoticiaSerializer.CAMPOS_RESUMO  # ?fields=...,conteudo_completo para o texto inteiro
     permission_classes = [AllowAny]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    pagination_class = PaginacaoNoticias  # ?paginacao=cursor para rolagem infinita
+    # ?search= usa Noticia.busca (titulo, resumo e conteudo_completo; ver busca.py), sem search_fields.
+    # A busca vem depois da ordenação para poder ordenar por relevância
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, BuscaTextoCompletoFilter]
     
     # Filtragem
     filterset_fields = ['fonte__id', 'fonte__categoria_padrao', 'categoria']  # ADICIONADO categoria
-    search_fields = ['titulo', 'resumo']
     ordering_fields = ['publicado_em', 'titulo']
     ordering = ['-publicado_em']
 
-class NoticiaDetailView(generics.RetrieveAPIView):
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        # ?agrupar=true: uma notícia por história, com o total de cópias em outras fontes
+        if self.request.query_params.get('agrupar', '').lower() in ('1', 'true', 'sim'):
+            queryset = queryset.filter(duplicata_de__isnull=True).annotate(total_duplicatas=Count('duplicatas'))
+        return queryset
+
+class NoticiaDetailView(ETagMixin, RespostaCacheadaMixin, CamposEsparsosMixin, generics.RetrieveAPIView):
     queryset = Noticia.objects.all()
     serializer_class = NoticiaSerializer
     permission_classes = [AllowAny]
     lookup_field = 'pk'
 
 # NOVA VIEW PARA CATEGORIAS
-class CategoriasListView(generics.ListAPIView):
+class CategoriasListView(ETagMixin, RespostaCacheadaMixin, generics.ListAPIView):
     permission_classes = [AllowAny]
     
-    def get(self, request, *args, **kwargs):
-        # Buscar categorias únicas das fontes ativas
-        categorias_fontes = Fonte.objects.filter(
-            ativo=True, 
-            categoria_padrao__isnull=False
-        ).values_list('categoria_padrao', flat=True).distinct()
-        
-        # Buscar categorias únicas das notícias (caso existam)
-        categorias_noticias = Noticia.objects.filter(
-            categoria__isnull=False
-        ).values_list('categoria', flat=True).distinct()
-        
-        # Combinar e remover duplicatas
-        todas_categorias = set(list(categorias_fontes) + list(categorias_noticias))
-        categorias_lista = sorted([cat for cat in todas_categorias if cat.strip()])
+    def list(self, request, *args, **kwargs):
+        # Índice mantido pela importação (categorias.py): uma leitura em tabela pequena
+        categorias = list(listar_categorias().values('nome', 'total_noticias', 'ultima_publicacao_em'))
         
         return Response({
-            "results": categorias_lista
-        })
\ No newline at end of file
+            "results": [categoria['nome'] for categoria in categorias],
+            "detalhes": categorias,
+        })
+
+class EstatisticasImportacaoView(APIView):
+    """
+    Telemetria da ingestão para a equipe: execuções e agregado por fonte.
+
+    ?dias=7 define a janela (1 a 90) e ?limite=50 quantas fontes voltam,
+    ordenadas pelo tempo de worker consumido (download, parse, gravação e
+    raspagem).
+    """
+    permission_classes = [IsAdminUser]
+
+    def _inteiro(self, nome, padrao, minimo, maximo):
+        try:
+            valor = int(self.request.query_params.get(nome, padrao))
+        except ValueError:
+            valor = padrao
+        return max(minimo, min(valor, maximo))
+
+    def get(self, request):
+        dias = self._inteiro('dias', 7, 1, 90)
+        limite = self._inteiro('limite', 50, 1, 500)
+        desde = timezone.now() - timedelta(days=dias)
+
+        execucoes = estatisticas_execucoes(desde)
+        duracao = execucoes.pop('duracao_media')
+        execucoes['duracao_media'] = round(duracao.total_seconds(), 3) if duracao else None
+
+        return Response({
+            'desde': desde,
+            'execucoes': execucoes,
+            'fontes': list(estatisticas_por_fonte(desde)[:limite]),
+        })
@@ -18,6 +18,7 @@ DJANGO_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'django_celery_beat',
 ]
 
@@ -255,6 +256,11 @@ LOGGING = {
             'level': 'INFO',
             'propagate': False,
         },
+        'apps.noticias': {
+            'handlers': ['file', 'console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
     },
 }
 
@@ -303,6 +309,37 @@ LUCA_ANONYMOUS_LIMIT = 4
 LUCA_REGISTERED_LIMIT = 11
 LUCA_RESET_DAYS = 7
 
+# Importação de notícias (feeds RSS/Atom)
+NOTICIAS_FETCH_TIMEOUT = float(os.getenv('NOTICIAS_FETCH_TIMEOUT', 20))        # segundos por feed
+NOTICIAS_IMPORTACAO_TENTATIVAS = 3                 # novas tentativas de uma fonte cuja importação levantou exceção
+NOTICIAS_IMPORTACAO_RECUO_RETRY = 30               # segundos antes da 1ª nova tentativa (dobra a cada uma)
+NOTICIAS_IMPORTACAO_PRAZO = 2 * 60 * 60            # execução ainda em andamento depois disso é encerrada como falha
+NOTICIAS_SCRAPING_WORKERS = int(os.getenv('NOTICIAS_SCRAPING_WORKERS', 8))    # páginas raspadas em paralelo
+NOTICIAS_SCRAPING_MAX_POR_DOMINIO = int(os.getenv('NOTICIAS_SCRAPING_MAX_POR_DOMINIO', 2))  # conexões por site
+NOTICIAS_SCRAPING_INTERVALO_DOMINIO = float(os.getenv('NOTICIAS_SCRAPING_INTERVALO_DOMINIO', 1.0))  # segundos entre requisições ao mesmo site
+NOTICIAS_SCRAPING_POOL_HOSTS = 50          # hosts com pool de conexões keep-alive
+NOTICIAS_SCRAPING_POOL_CONEXOES = 4        # conexões reaproveitadas por host
+NOTICIAS_SCRAPING_CACHE_TTL = 7 * 24 * 60 * 60     # conteúdo extraído com sucesso (7 dias)
+NOTICIAS_SCRAPING_CACHE_TTL_FALHA = 6 * 60 * 60    # cache negativo para 404/timeout (6 horas)
+NOTICIAS_COLETA_INTERVALO_PADRAO = 30 * 60        # intervalo inicial e base do recuo após falhas
+NOTICIAS_COLETA_INTERVALO_MIN = 5 * 60             # fontes muito ativas
+NOTICIAS_COLETA_INTERVALO_MAX = 24 * 60 * 60       # fontes paradas ou com falhas seguidas
+NOTICIAS_COLETA_RESERVA = 15 * 60                  # tempo reservado para uma coleta despachada terminar
+NOTICIAS_MINIATURAS_LARGURAS = [320, 640]          # larguras (px) das miniaturas geradas em MEDIA_ROOT
+NOTICIAS_IMAGEM_TAMANHO_MAXIMO = 10 * 1024 * 1024  # não baixa imagens maiores que 10 MB
+NOTICIAS_DUPLICATAS_JANELA_DIAS = 3                # só compara notícias publicadas com até 3 dias de diferença
+NOTICIAS_DUPLICATAS_DISTANCIA = 3                  # bits de diferença no SimHash para considerar a mesma história
+NOTICIAS_API_CACHE_TTL = 10 * 60                   # respostas públicas cacheadas (invalidadas por versão a cada importação)
+NOTICIAS_API_HOST = os.getenv('NOTICIAS_API_HOST', 'localhost')  # host usado para aquecer o cache (links de paginação)
+NOTICIAS_API_HTTPS = os.getenv('NOTICIAS_API_HTTPS', 'False') == 'True'
+NOTICIAS_RETENCAO_MESES = int(os.getenv('NOTICIAS_RETENCAO_MESES', 6))  # meses completos mantidos na tabela principal
+NOTICIAS_ARQUIVAMENTO_LOTE = 1000                  # notícias movidas para o arquivo por transação
+NOTICIAS_EXECUCOES_RETENCAO_DIAS = 30              # ImportRun/ImportRunFonte mais antigas são apagadas na retenção diária
+NOTICIAS_CIRCUITO_FALHAS = 5                       # falhas seguidas que abrem o circuito de uma fonte/domínio
+NOTICIAS_CIRCUITO_RECUO_INICIAL = 30 * 60          # primeira espera com o circuito aberto (dobra a cada sonda que falha)
+NOTICIAS_CIRCUITO_RECUO_MAXIMO = 24 * 60 * 60
+NOTICIAS_CIRCUITO_TIMEOUT_SONDA = 5                # segundos: a sonda de um circuito aberto é uma tentativa barata
+
 # URLs do sistema
 FRONTEND_URL = 'http://localhost:3000'  # Será sobrescrito em development/production
 SITE_URL = 'https://multibpo.com.br'
@@ -41,6 +41,17 @@ CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = 'America/Sao_Paulo'
 
+# Filas das notícias: a coleta de feeds não espera atrás da raspagem e das
+# miniaturas. O worker precisa consumir todas: -Q celery,noticias_ingestao,noticias_scraping
+CELERY_TASK_ROUTES = {
+    'apps.noticias.tasks.importar_noticias_task': {'queue': 'noticias_ingestao'},
+    'apps.noticias.tasks.importar_fonte_task': {'queue': 'noticias_ingestao'},
+    'apps.noticias.tasks.finalizar_importacao_task': {'queue': 'noticias_ingestao'},
+    'apps.noticias.tasks.falhar_importacao_task': {'queue': 'noticias_ingestao'},
+    'apps.noticias.tasks.raspar_conteudo_task': {'queue': 'noticias_scraping'},
+    'apps.noticias.tasks.gerar_miniaturas_task': {'queue': 'noticias_scraping'},
+}
+
 # Celery Beat schedule
 # from apps.noticias.tasks import CELERY_BEAT_SCHEDULE
 #CELERY_BEAT_SCHEDULE = CELERY_BEAT_SCHEDULE
@@ -22,6 +22,7 @@ urlpatterns = [
 # Debug Toolbar URLs (apenas em desenvolvimento)
 if settings.DEBUG:
     import debug_toolbar
+    from django.conf.urls.static import static
     urlpatterns = [
         path('__debug__/', include(debug_toolbar.urls)),
-    ] + urlpatterns
+    ] + urlpatterns + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)  # miniaturas das notícias